@@ -0,0 +1,139 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, Optional, Union
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_stock_market import StockObserver
+
+class AsyncStockObserver(ABC):
+    @abstractmethod
+    async def update(self, stock_symbol: str, price: float, output_file=None):
+        pass
+
+class OverflowPolicy(Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+AnyObserver = Union[StockObserver, AsyncStockObserver]
+
+class _Subscription:
+    def __init__(self, observer: AnyObserver, maxsize: int, policy: OverflowPolicy):
+        self.observer = observer
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+class AsyncObserverDispatcher:
+    # Every observer gets its own bounded queue and consumer task, so a slow
+    # subscriber only ever delays itself. Synchronous StockObservers are run
+    # in a worker thread to keep them off the event loop.
+    def __init__(self, maxsize: int = 1000, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST):
+        self.default_maxsize = maxsize
+        self.default_policy = policy
+        self._subscriptions: Dict[int, _Subscription] = {}
+    
+    def add_observer(self, observer: AnyObserver, maxsize: Optional[int] = None,
+                     policy: Optional[OverflowPolicy] = None):
+        if id(observer) in self._subscriptions:
+            return
+        subscription = _Subscription(
+            observer,
+            self.default_maxsize if maxsize is None else maxsize,
+            policy or self.default_policy,
+        )
+        self._subscriptions[id(observer)] = subscription
+    
+    async def remove_observer(self, observer: AnyObserver):
+        subscription = self._subscriptions.pop(id(observer), None)
+        if subscription and subscription.task:
+            subscription.task.cancel()
+            await asyncio.gather(subscription.task, return_exceptions=True)
+    
+    async def publish(self, stock_symbol: str, price: float, output_file=None):
+        item = (stock_symbol, price, output_file)
+        for subscription in list(self._subscriptions.values()):
+            if subscription.task is None:
+                subscription.task = asyncio.get_running_loop().create_task(self._consume(subscription))
+            queue = subscription.queue
+            if not queue.full():
+                queue.put_nowait(item)
+            elif subscription.policy == OverflowPolicy.BLOCK:
+                await queue.put(item)
+            elif subscription.policy == OverflowPolicy.DROP_NEWEST:
+                subscription.dropped += 1
+            else:
+                queue.get_nowait()
+                queue.task_done()
+                subscription.dropped += 1
+                queue.put_nowait(item)
+    
+    async def _consume(self, subscription: _Subscription):
+        observer = subscription.observer
+        is_async = isinstance(observer, AsyncStockObserver)
+        queue = subscription.queue
+        while True:
+            stock_symbol, price, output_file = await queue.get()
+            try:
+                if is_async:
+                    await observer.update(stock_symbol, price, output_file)
+                else:
+                    await asyncio.to_thread(observer.update, stock_symbol, price, output_file)
+                subscription.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                subscription.errors += 1
+            finally:
+                queue.task_done()
+    
+    async def join(self):
+        # Wait until every queued notification has been delivered
+        for subscription in list(self._subscriptions.values()):
+            await subscription.queue.join()
+    
+    async def close(self):
+        for subscription in list(self._subscriptions.values()):
+            await self.remove_observer(subscription.observer)
+    
+    def stats(self, observer: AnyObserver) -> Dict[str, int]:
+        subscription = self._subscriptions[id(observer)]
+        return {
+            "delivered": subscription.delivered,
+            "dropped": subscription.dropped,
+            "errors": subscription.errors,
+            "pending": subscription.queue.qsize(),
+        }
+
+class AsyncStock:
+    def __init__(self, symbol: str, initial_price: float,
+                 dispatcher: Optional[AsyncObserverDispatcher] = None):
+        self.symbol = symbol
+        self._price = initial_price
+        self._dispatcher = dispatcher or AsyncObserverDispatcher()
+    
+    @property
+    def dispatcher(self) -> AsyncObserverDispatcher:
+        return self._dispatcher
+    
+    def add_observer(self, observer: AnyObserver, maxsize: Optional[int] = None,
+                     policy: Optional[OverflowPolicy] = None):
+        self._dispatcher.add_observer(observer, maxsize, policy)
+    
+    async def remove_observer(self, observer: AnyObserver):
+        await self._dispatcher.remove_observer(observer)
+    
+    async def set_price(self, new_price: float, output_file=None):
+        old_price = self._price
+        self._price = new_price
+        if old_price != new_price:
+            await self._notify_observers(output_file)
+    
+    async def _notify_observers(self, output_file=None):
+        await self._dispatcher.publish(self.symbol, self._price, output_file)
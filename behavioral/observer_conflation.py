@@ -0,0 +1,119 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_stock_market import StockObserver
+
+class ConflatingObserver(StockObserver):
+    # Latest-value delivery: pending updates are collapsed per symbol and the
+    # wrapped observer only sees the newest price. Delivery happens on flush(),
+    # or automatically at most max_rate times per second as updates arrive.
+    # Rate-limited wrappers still need a periodic flush() to deliver the tail
+    # of a burst; ConflationGroup.start() runs one on a background thread.
+    def __init__(self, observer: StockObserver, max_rate: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.observer = observer
+        self._min_interval = 1.0 / max_rate if max_rate else None
+        self._clock = clock
+        self._last_flush = clock()
+        self._pending: Dict[str, Tuple[float, object]] = {}
+        # Guards _pending when a group timer flushes from another thread
+        self._lock = threading.Lock()
+        # Held for a whole flush so concurrent flushes deliver in order and
+        # an older price can never land after a newer one
+        self._deliver_lock = threading.Lock()
+        self.received = 0
+        self.coalesced = 0
+        self.delivered = 0
+    
+    def update(self, stock_symbol: str, price: float, output_file=None):
+        with self._lock:
+            self.received += 1
+            if stock_symbol in self._pending:
+                self.coalesced += 1
+            self._pending[stock_symbol] = (price, output_file)
+        if self._min_interval is not None and self._clock() - self._last_flush >= self._min_interval:
+            self.flush()
+    
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+    
+    def flush(self) -> int:
+        with self._deliver_lock:
+            with self._lock:
+                self._last_flush = self._clock()
+                if not self._pending:
+                    return 0
+                pending, self._pending = self._pending, {}
+            
+            # Normally every update shares one output file, giving a single batch
+            batches: Dict[int, Tuple[object, List[str], List[float]]] = {}
+            for stock_symbol, (price, output_file) in pending.items():
+                batch = batches.get(id(output_file))
+                if batch is None:
+                    batch = batches[id(output_file)] = (output_file, [], [])
+                batch[1].append(stock_symbol)
+                batch[2].append(price)
+            for output_file, symbols, prices in batches.values():
+                self.observer.update_batch(symbols, prices, output_file)
+            self.delivered += len(pending)
+            return len(pending)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "delivered": self.delivered,
+            "pending": len(self._pending),
+        }
+
+class ConflationGroup:
+    # Shared flush tick for a set of conflating observers
+    def __init__(self, max_rate: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_rate = max_rate
+        self._clock = clock
+        self._observers: List[ConflatingObserver] = []
+        self._ticker: Optional[threading.Thread] = None
+        self._stop_ticking = threading.Event()
+    
+    def wrap(self, observer: StockObserver, max_rate: Optional[float] = None) -> ConflatingObserver:
+        conflating = ConflatingObserver(observer, max_rate or self.max_rate, self._clock)
+        self._observers.append(conflating)
+        return conflating
+    
+    def flush(self) -> int:
+        return sum(observer.flush() for observer in list(self._observers))
+    
+    def start(self, interval: Optional[float] = None):
+        # Flushes every interval seconds (default: 1 / max_rate) in a daemon
+        # thread, so the last update of a burst is delivered even when no
+        # further updates arrive to trigger it
+        if self._ticker is not None and self._ticker.is_alive():
+            return
+        if interval is None:
+            if not self.max_rate:
+                raise ValueError("start() needs an interval when the group has no max_rate")
+            interval = 1.0 / self.max_rate
+        self._stop_ticking.clear()
+        
+        def tick():
+            while not self._stop_ticking.wait(interval):
+                self.flush()
+        
+        self._ticker = threading.Thread(target=tick, name="conflation-flush", daemon=True)
+        self._ticker.start()
+    
+    def stop(self):
+        # Stops the timer and delivers whatever is still pending
+        self._stop_ticking.set()
+        if self._ticker is not None:
+            self._ticker.join()
+            self._ticker = None
+        self.flush()
+    
+    def stats(self) -> Dict[StockObserver, Dict[str, int]]:
+        return {conflating.observer: conflating.stats() for conflating in self._observers}
@@ -0,0 +1,207 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import mmap
+import os
+import struct
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_registry import SubscriptionRegistry
+from behavioral.observer_stock_market import StockObserver
+
+# File layout: a 16 byte header followed by fixed-width tick records.
+#   header: magic, record size, record count
+#   record: symbol id (uint32), padding, timestamp in ns (int64), price (float64)
+# Symbol names are kept in a "<path>.symbols" side file, one per line, where
+# the line number is the symbol id.
+MAGIC = b"TKJ1"
+_HEADER = struct.Struct("<4sIQ")
+_RECORD = struct.Struct("<I4xqd")
+_TIMESTAMP = struct.Struct("<q")
+_TIMESTAMP_OFFSET = 8
+
+class TickJournal:
+    # Append-only tick history backed by a memory-mapped file. Reads return
+    # memoryviews straight over the mapping, so replay never copies records.
+    # The file grows by doubling; views returned by view() must be released
+    # before an append that needs to grow the file.
+    def __init__(self, path: str, initial_capacity: int = 1 << 16):
+        self.path = path
+        self._symbols_path = path + ".symbols"
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, _RECORD.size, 0))
+                f.truncate(_HEADER.size + initial_capacity * _RECORD.size)
+        self._file = open(path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, record_size, self._count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"Not a tick journal: {path}")
+        self._capacity = (len(self._mmap) - _HEADER.size) // _RECORD.size
+        
+        self._symbols: List[str] = []
+        if os.path.exists(self._symbols_path):
+            with open(self._symbols_path) as f:
+                self._symbols = f.read().splitlines()
+        self._symbol_ids: Dict[str, int] = {symbol: i for i, symbol in enumerate(self._symbols)}
+        self._symbols_file = open(self._symbols_path, "a")
+        self._last_timestamp = self._timestamp_at(self._count - 1) if self._count else None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def symbol_id(self, symbol: str) -> int:
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            self._symbols_file.write(symbol + "\n")
+            self._symbols_file.flush()
+        return symbol_id
+    
+    def append(self, symbol: str, price: float, timestamp: Optional[int] = None):
+        if timestamp is None:
+            timestamp = time.time_ns()
+            if self._last_timestamp is not None and timestamp < self._last_timestamp:
+                timestamp = self._last_timestamp
+        elif self._last_timestamp is not None and timestamp < self._last_timestamp:
+            raise ValueError("Tick timestamps must be non-decreasing")
+        if self._count == self._capacity:
+            self._grow()
+        offset = _HEADER.size + self._count * _RECORD.size
+        _RECORD.pack_into(self._mmap, offset, self.symbol_id(symbol), timestamp, price)
+        self._count += 1
+        self._last_timestamp = timestamp
+        _HEADER.pack_into(self._mmap, 0, MAGIC, _RECORD.size, self._count)
+    
+    def append_many(self, ticks: Iterable[Tuple[str, float, int]]):
+        for symbol, price, timestamp in ticks:
+            self.append(symbol, price, timestamp)
+    
+    def _grow(self):
+        self._capacity = max(1, self._capacity * 2)
+        self._mmap.close()
+        self._file.truncate(_HEADER.size + self._capacity * _RECORD.size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+    
+    def _timestamp_at(self, index: int) -> int:
+        offset = _HEADER.size + index * _RECORD.size + _TIMESTAMP_OFFSET
+        return _TIMESTAMP.unpack_from(self._mmap, offset)[0]
+    
+    def _bisect(self, timestamp: int, right: bool) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self._timestamp_at(mid)
+            if value < timestamp or (right and value == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _range(self, start_ts: Optional[int], end_ts: Optional[int]) -> Tuple[int, int]:
+        # Records are time ordered, so a time range maps to an index range
+        start = 0 if start_ts is None else self._bisect(start_ts, right=False)
+        end = self._count if end_ts is None else self._bisect(end_ts, right=False)
+        return start, max(start, end)
+    
+    def view(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> memoryview:
+        # Raw records with start_ts <= timestamp < end_ts, without copying
+        start, end = self._range(start_ts, end_ts)
+        return memoryview(self._mmap)[_HEADER.size + start * _RECORD.size:_HEADER.size + end * _RECORD.size]
+    
+    def records(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Iterator[Tuple[str, int, float]]:
+        symbols = self._symbols
+        with self.view(start_ts, end_ts) as records:
+            for symbol_id, timestamp, price in _RECORD.iter_unpack(records):
+                yield symbols[symbol_id], timestamp, price
+    
+    def replay(self, observers: Union[SubscriptionRegistry, Iterable[StockObserver]],
+               start_ts: Optional[int] = None, end_ts: Optional[int] = None,
+               batch_size: Optional[int] = None, output_file=None) -> int:
+        # Streams the range into observers tick by tick, or as update_batch
+        # calls of up to batch_size ticks each. Returns the number of ticks.
+        if isinstance(observers, SubscriptionRegistry):
+            targets = observers.observers_for
+        else:
+            observer_list = list(observers)
+            targets = lambda symbol: observer_list
+            if batch_size:
+                # Every observer gets every tick, so each batch's columns go
+                # out as they are instead of being regrouped per observer
+                count = 0
+                for symbols, prices in self._column_batches(start_ts, end_ts, batch_size):
+                    for observer in observer_list:
+                        observer.update_batch(symbols, prices, output_file)
+                    count += len(symbols)
+                return count
+        
+        count = 0
+        if not batch_size:
+            for symbol, _, price in self.records(start_ts, end_ts):
+                for observer in targets(symbol):
+                    observer.update(symbol, price, output_file)
+                count += 1
+            return count
+        
+        batch: List[Tuple[str, float]] = []
+        for symbol, _, price in self.records(start_ts, end_ts):
+            batch.append((symbol, price))
+            if len(batch) == batch_size:
+                self._dispatch_batch(batch, targets, output_file)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._dispatch_batch(batch, targets, output_file)
+            count += len(batch)
+        return count
+    
+    def _column_batches(self, start_ts: Optional[int], end_ts: Optional[int],
+                        batch_size: int) -> Iterator[Tuple[List[str], List[float]]]:
+        # (symbols, prices) columns of up to batch_size records each. On
+        # little-endian hosts the columns are strided views over the mapped
+        # records (symbol id at uint32 0 of 6, price at double 2 of 3).
+        lookup = self._symbols.__getitem__
+        step = batch_size * _RECORD.size
+        with self.view(start_ts, end_ts) as records:
+            for offset in range(0, len(records), step):
+                with records[offset:offset + step] as chunk:
+                    if sys.byteorder == "little":
+                        symbol_ids = chunk.cast("I")[0::6].tolist()
+                        prices = chunk.cast("d")[2::3].tolist()
+                    else:
+                        symbol_ids, _, prices = zip(*_RECORD.iter_unpack(chunk))
+                yield list(map(lookup, symbol_ids)), list(prices)
+    
+    @staticmethod
+    def _dispatch_batch(batch, targets, output_file=None):
+        per_observer: Dict[int, Tuple[StockObserver, List[str], List[float]]] = {}
+        for symbol, price in batch:
+            for observer in targets(symbol):
+                entry = per_observer.get(id(observer))
+                if entry is None:
+                    entry = per_observer[id(observer)] = (observer, [], [])
+                entry[1].append(symbol)
+                entry[2].append(price)
+        for observer, symbols, prices in per_observer.values():
+            observer.update_batch(symbols, prices, output_file)
+    
+    def flush(self):
+        self._mmap.flush()
+    
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.flush()
+            self._mmap.close()
+        if not self._file.closed:
+            self._file.close()
+        symbols_file = getattr(self, "_symbols_file", None)
+        if symbols_file is not None and not symbols_file.closed:
+            symbols_file.close()
@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Set, Tuple
+import itertools
+import weakref
+
+# Subscription patterns:
+#   "AAPL" -> exact symbol
+#   "AA*"  -> every symbol starting with "AA"
+#   "*"    -> every symbol
+ALL_SYMBOLS = "*"
+
+_EXACT = "exact"
+_PREFIX = "prefix"
+_ALL = "all"
+
+class SubscriptionRegistry:
+    # Observers are held through weak references and indexed by pattern, so
+    # subscribe/unsubscribe are O(1) and dispatch only visits the buckets that
+    # can match a symbol. Collected observers are removed automatically.
+    def __init__(self):
+        self._exact: Dict[str, Dict[int, Tuple[int, weakref.ref]]] = {}
+        self._prefix: Dict[str, Dict[int, Tuple[int, weakref.ref]]] = {}
+        self._all: Dict[int, Tuple[int, weakref.ref]] = {}
+        self._refs: Dict[int, weakref.ref] = {}
+        self._subscriptions: Dict[int, Set[Tuple[str, str]]] = {}
+        self._max_prefix_len = 0
+        self._seq = itertools.count()
+    
+    @staticmethod
+    def _parse(pattern: str) -> Tuple[str, str]:
+        if pattern == ALL_SYMBOLS:
+            return _ALL, ""
+        if pattern.endswith("*"):
+            prefix = pattern[:-1]
+            return (_PREFIX, prefix) if prefix else (_ALL, "")
+        return _EXACT, pattern
+    
+    def _bucket(self, kind: str, key: str, create: bool = False):
+        if kind == _ALL:
+            return self._all
+        index = self._exact if kind == _EXACT else self._prefix
+        bucket = index.get(key)
+        if bucket is None and create:
+            bucket = index[key] = {}
+            if kind == _PREFIX:
+                self._max_prefix_len = max(self._max_prefix_len, len(key))
+        return bucket
+    
+    def _drop(self, oid: int, kind: str, key: str):
+        bucket = self._bucket(kind, key)
+        if bucket is None:
+            return
+        bucket.pop(oid, None)
+        if not bucket and kind != _ALL:
+            index = self._exact if kind == _EXACT else self._prefix
+            del index[key]
+    
+    def subscribe(self, observer, pattern: str = ALL_SYMBOLS):
+        oid = id(observer)
+        ref = self._refs.get(oid)
+        if ref is None:
+            registry_ref = weakref.ref(self)
+            
+            def _cleanup(_, oid=oid):
+                registry = registry_ref()
+                if registry is not None:
+                    registry._forget(oid)
+            
+            ref = self._refs[oid] = weakref.ref(observer, _cleanup)
+            self._subscriptions[oid] = set()
+        kind, key = self._parse(pattern)
+        bucket = self._bucket(kind, key, create=True)
+        if oid not in bucket:
+            bucket[oid] = (next(self._seq), ref)
+            self._subscriptions[oid].add((kind, key))
+    
+    def unsubscribe(self, observer, pattern: Optional[str] = None):
+        oid = id(observer)
+        subscriptions = self._subscriptions.get(oid)
+        if subscriptions is None:
+            return
+        if pattern is None:
+            for kind, key in subscriptions:
+                self._drop(oid, kind, key)
+            subscriptions.clear()
+        else:
+            kind, key = self._parse(pattern)
+            if (kind, key) in subscriptions:
+                self._drop(oid, kind, key)
+                subscriptions.discard((kind, key))
+        if not subscriptions:
+            del self._subscriptions[oid]
+            del self._refs[oid]
+    
+    def _forget(self, oid: int):
+        for kind, key in self._subscriptions.pop(oid, ()):
+            self._drop(oid, kind, key)
+        self._refs.pop(oid, None)
+    
+    def is_subscribed(self, observer, pattern: Optional[str] = None) -> bool:
+        subscriptions = self._subscriptions.get(id(observer))
+        if not subscriptions:
+            return False
+        return pattern is None or self._parse(pattern) in subscriptions
+    
+    def all_symbol_observers(self) -> List:
+        return _live(self._all.values())
+    
+    def observers_for(self, symbol: str, include_all: bool = True) -> List:
+        buckets = []
+        exact = self._exact.get(symbol)
+        if exact:
+            buckets.append(exact)
+        if self._prefix:
+            for length in range(1, min(len(symbol), self._max_prefix_len) + 1):
+                bucket = self._prefix.get(symbol[:length])
+                if bucket:
+                    buckets.append(bucket)
+        if include_all and self._all:
+            buckets.append(self._all)
+        
+        if not buckets:
+            return []
+        if len(buckets) == 1:
+            return _live(buckets[0].values())
+        # Several patterns matched: deliver once per observer, in subscription order
+        merged: Dict[int, Tuple[int, weakref.ref]] = {}
+        for bucket in buckets:
+            for oid, entry in bucket.items():
+                if oid not in merged or entry[0] < merged[oid][0]:
+                    merged[oid] = entry
+        return _live(sorted(merged.values(), key=lambda entry: entry[0]))
+    
+    def __len__(self) -> int:
+        return len(self._refs)
+
+def _live(entries) -> List:
+    observers = []
+    for _, ref in list(entries):
+        observer = ref()
+        if observer is not None:
+            observers.append(observer)
+    return observers
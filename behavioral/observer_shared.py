@@ -0,0 +1,169 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import multiprocessing
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_stock_market import StockObserver
+
+class SharedPriceTable:
+    # Price table in a multiprocessing.shared_memory segment laid out as
+    #   [sequence: uint64][ack per worker: uint64 ...][price per symbol: float64 ...]
+    # The producer guards writes with a seqlock: the sequence is odd while a
+    # write is in progress, so readers retry instead of seeing torn prices.
+    def __init__(self, symbols: Sequence[str], workers: int, name: Optional[str] = None):
+        self.symbols = list(symbols)
+        self.workers = workers
+        self._header_size = 8 * (1 + workers)
+        self._owner = name is None
+        if self._owner:
+            size = self._header_size + 8 * max(1, len(self.symbols))
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._header = self._shm.buf[:self._header_size].cast("Q")
+        self._prices = self._shm.buf[self._header_size:self._header_size + 8 * len(self.symbols)].cast("d")
+        if self._owner:
+            for i in range(len(self._header)):
+                self._header[i] = 0
+            for i in range(len(self._prices)):
+                self._prices[i] = math.nan
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    @property
+    def sequence(self) -> int:
+        return self._header[0]
+    
+    def write(self, updates: Iterable[Tuple[int, float]]) -> int:
+        header = self._header
+        prices = self._prices
+        header[0] += 1
+        for index, price in updates:
+            prices[index] = price
+        header[0] += 1
+        return header[0]
+    
+    def read(self) -> Tuple[int, array]:
+        header = self._header
+        while True:
+            before = header[0]
+            if before & 1:
+                continue
+            snapshot = array("d", self._prices)
+            if header[0] == before:
+                return before, snapshot
+    
+    def ack(self, worker: int, sequence: int):
+        self._header[1 + worker] = sequence
+    
+    def acked(self, worker: int) -> int:
+        return self._header[1 + worker]
+    
+    def close(self):
+        self._header.release()
+        self._prices.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+def _worker_main(table_name: str, symbols: List[str], worker: int, workers: int,
+                 observers: List[StockObserver], notifications):
+    table = SharedPriceTable(symbols, workers, name=table_name)
+    last = array("d", [math.nan]) * len(symbols)
+    try:
+        while True:
+            sequence = notifications.get()
+            if sequence is None:
+                break
+            # Only the newest version matters, so skip notifications that queued up
+            while not notifications.empty():
+                newer = notifications.get()
+                if newer is None:
+                    return
+                sequence = newer
+            version, prices = table.read()
+            changed = [i for i in range(len(prices)) if prices[i] != last[i] and not math.isnan(prices[i])]
+            if changed:
+                changed_symbols = [symbols[i] for i in changed]
+                changed_prices = array("d", [prices[i] for i in changed])
+                for observer in observers:
+                    observer.update_batch(changed_symbols, changed_prices)
+            last = prices
+            table.ack(worker, version)
+    finally:
+        table.close()
+
+class ProcessObserverPool:
+    # Fans observers out over worker processes. Prices travel through the
+    # shared table; only the sequence number of each publish is sent to the
+    # workers. Observers must be picklable, and output goes to the worker's
+    # stdout (or wherever the observer writes on its own).
+    def __init__(self, symbols: Sequence[str], observers: Sequence[StockObserver],
+                 workers: Optional[int] = None, context=None):
+        self.symbols = list(symbols)
+        self._index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(observers) or 1))
+        self._partitions: List[List[StockObserver]] = [list(observers[i::self.workers]) for i in range(self.workers)]
+        self._context = context or multiprocessing.get_context()
+        self._table: Optional[SharedPriceTable] = None
+        self._queues = []
+        self._processes = []
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def start(self):
+        self._table = SharedPriceTable(self.symbols, self.workers)
+        for worker, observers in enumerate(self._partitions):
+            queue = self._context.SimpleQueue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self._table.name, self.symbols, worker, self.workers, observers, queue),
+                daemon=True,
+            )
+            process.start()
+            self._queues.append(queue)
+            self._processes.append(process)
+    
+    def publish(self, ticks: Iterable[Tuple[str, float]]) -> int:
+        # Resolve symbols first so a bad tick can't leave a write half done
+        index = self._index
+        updates = [(index[symbol], price) for symbol, price in ticks]
+        sequence = self._table.write(updates)
+        for queue in self._queues:
+            queue.put(sequence)
+        return sequence
+    
+    def wait(self, sequence: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        # Blocks until every worker has processed the given publish
+        target = self._table.sequence if sequence is None else sequence
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while any(self._table.acked(worker) < target for worker in range(self.workers)):
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            if not all(process.is_alive() for process in self._processes):
+                raise RuntimeError("Observer worker process exited unexpectedly")
+            time.sleep(0.0005)
+        return True
+    
+    def close(self):
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            process.join()
+        self._queues.clear()
+        self._processes.clear()
+        if self._table is not None:
+            self._table.close()
+            self._table = None
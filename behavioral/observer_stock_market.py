@@ -1,49 +1,151 @@
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from behavioral.observer_registry import ALL_SYMBOLS, SubscriptionRegistry
+from common.output_sink import emit
+
 class StockObserver(ABC):
+    # Where messages go when update() is not given an output_file; set once
+    # per observer (see common.output_sink) instead of passing it on every call
+    sink = None
+    
     @abstractmethod
     def update(self, stock_symbol: str, price: float, output_file=None):
         pass
+    
+    def update_batch(self, symbols: Sequence[str], prices: Sequence[float], output_file=None):
+        # Default adapter for observers that only understand single ticks;
+        # array-aware observers override this to consume the whole batch.
+        for symbol, price in zip(symbols, prices):
+            self.update(symbol, price, output_file)
 
 class Stock:
-    def __init__(self, symbol: str, initial_price: float):
+    def __init__(self, symbol: str, initial_price: float, registry: Optional[SubscriptionRegistry] = None,
+                 journal=None):
         self.symbol = symbol
         self._price = initial_price
-        self._observers: List[StockObserver] = []
+        # Pass a shared registry to make wildcard subscriptions see this stock
+        self._registry = registry if registry is not None else SubscriptionRegistry()
+        # Optional TickJournal recording every price change
+        self._journal = journal
     
     def add_observer(self, observer: StockObserver):
-        self._observers.append(observer)
+        self._registry.subscribe(observer, self.symbol)
     
     def remove_observer(self, observer: StockObserver):
-        if observer in self._observers:
-            self._observers.remove(observer)
+        self._registry.unsubscribe(observer, self.symbol)
     
     def set_price(self, new_price: float, output_file=None):
         old_price = self._price
         self._price = new_price
         if old_price != new_price:
+            if self._journal is not None:
+                self._journal.append(self.symbol, new_price)
             self._notify_observers(output_file)
     
     def _notify_observers(self, output_file=None):
-        for observer in self._observers:
+        for observer in self._registry.observers_for(self.symbol):
             observer.update(self.symbol, self._price, output_file)
 
+# Market-wide price table: prices live in a contiguous array indexed by
+# symbol id, and each batch of ticks results in one update_batch per observer.
+class Market:
+    def __init__(self, initial_prices: Optional[Dict[str, float]] = None,
+                 registry: Optional[SubscriptionRegistry] = None, journal=None):
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._prices = array("d")
+        self._registry = registry if registry is not None else SubscriptionRegistry()
+        self._journal = journal
+        for symbol, price in (initial_prices or {}).items():
+            self.add_symbol(symbol, price)
+    
+    def add_symbol(self, symbol: str, initial_price: float = float("nan")) -> int:
+        index = self._index.get(symbol)
+        if index is None:
+            index = len(self._symbols)
+            self._index[symbol] = index
+            self._symbols.append(symbol)
+            self._prices.append(initial_price)
+        return index
+    
+    def get_price(self, symbol: str) -> float:
+        return self._prices[self._index[symbol]]
+    
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+    
+    def add_observer(self, observer: StockObserver, pattern: str = ALL_SYMBOLS):
+        self._registry.subscribe(observer, pattern)
+    
+    def remove_observer(self, observer: StockObserver, pattern: Optional[str] = None):
+        self._registry.unsubscribe(observer, pattern)
+    
+    def apply_ticks(self, ticks: Iterable[Tuple[str, float]], output_file=None) -> List[str]:
+        # Collapse the batch to the last price per symbol id, then diff it
+        # against the table in one pass instead of once per tick.
+        index = self._index
+        latest: Dict[int, float] = {}
+        for symbol, price in ticks:
+            i = index.get(symbol)
+            if i is None:
+                i = self.add_symbol(symbol)
+            latest[i] = price
+        
+        prices = self._prices
+        changed_ids = [i for i, price in latest.items() if prices[i] != price]
+        if not changed_ids:
+            return []
+        changed_ids.sort()
+        
+        changed_prices = array("d", [latest[i] for i in changed_ids])
+        for i, price in zip(changed_ids, changed_prices):
+            prices[i] = price
+        changed_symbols = [self._symbols[i] for i in changed_ids]
+        if self._journal is not None:
+            for symbol, price in zip(changed_symbols, changed_prices):
+                self._journal.append(symbol, price)
+        
+        registry = self._registry
+        everything = registry.all_symbol_observers()
+        for observer in everything:
+            observer.update_batch(changed_symbols, changed_prices, output_file)
+        
+        # Symbol and prefix subscribers only receive the part of the batch they
+        # match; those also subscribed to "*" already got the whole batch
+        skip = {id(observer) for observer in everything}
+        partial: Dict[int, Tuple[StockObserver, List[str], array]] = {}
+        for symbol, price in zip(changed_symbols, changed_prices):
+            for observer in registry.observers_for(symbol, include_all=False):
+                if id(observer) in skip:
+                    continue
+                entry = partial.get(id(observer))
+                if entry is None:
+                    entry = partial[id(observer)] = (observer, [], array("d"))
+                entry[1].append(symbol)
+                entry[2].append(price)
+        for observer, symbols, batch_prices in partial.values():
+            observer.update_batch(symbols, batch_prices, output_file)
+        return changed_symbols
+
 class MobileApp(StockObserver):
-    def __init__(self, app_name: str):
+    def __init__(self, app_name: str, sink=None):
         self.app_name = app_name
+        self.sink = sink
     
     def update(self, stock_symbol: str, price: float, output_file=None):
         message = f"[{self.app_name}] Stock {stock_symbol} price updated: ${price:.2f}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
 
 class TradingBot(StockObserver):
+    def __init__(self, sink=None):
+        self.sink = sink
+    
     def update(self, stock_symbol: str, price: float, output_file=None):
         if price > 150:
             message = f"[TradingBot] Selling {stock_symbol} at high price ${price:.2f}"
@@ -52,10 +154,7 @@ class TradingBot(StockObserver):
         else:
             message = f"[TradingBot] Monitoring {stock_symbol} at ${price:.2f}"
         
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
 
 def demo_observer(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
@@ -0,0 +1,129 @@
+from bisect import bisect_left, bisect_right, insort
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_stock_market import StockObserver
+from common.output_sink import emit
+
+class CrossDirection(Enum):
+    UP = "up"
+    DOWN = "down"
+    BOTH = "both"
+
+class TriggerRule:
+    __slots__ = ("symbol", "level", "direction", "action", "one_shot", "active")
+    
+    def __init__(self, symbol: str, level: float, direction: CrossDirection,
+                 action: Optional[Callable] = None, one_shot: bool = False):
+        self.symbol = symbol
+        self.level = level
+        self.direction = direction
+        self.action = action
+        self.one_shot = one_shot
+        self.active = True
+    
+    def matches(self, direction: CrossDirection) -> bool:
+        return self.direction == CrossDirection.BOTH or self.direction == direction
+
+class _LevelIndex:
+    # Sorted, de-duplicated trigger levels for one symbol plus the rules
+    # registered at each level.
+    def __init__(self):
+        self.levels: List[float] = []
+        self.rules: Dict[float, List[TriggerRule]] = {}
+    
+    def add(self, rule: TriggerRule):
+        bucket = self.rules.get(rule.level)
+        if bucket is None:
+            bucket = self.rules[rule.level] = []
+            insort(self.levels, rule.level)
+        bucket.append(rule)
+    
+    def remove(self, rule: TriggerRule):
+        bucket = self.rules.get(rule.level)
+        if not bucket or rule not in bucket:
+            return
+        bucket.remove(rule)
+        if not bucket:
+            del self.rules[rule.level]
+            del self.levels[bisect_left(self.levels, rule.level)]
+    
+    def __len__(self) -> int:
+        return len(self.levels)
+
+class PriceTriggerEngine(StockObserver):
+    # Evaluates threshold rules by crossing instead of by scanning: a move from
+    # old to new price only touches the levels in between, found by bisection,
+    # so each tick costs O(log n + k) for k fired rules.
+    #
+    # Rising prices fire levels in (old, new], falling prices fire [new, old).
+    def __init__(self, sink=None):
+        self.sink = sink
+        self._indexes: Dict[str, _LevelIndex] = {}
+        self._last_prices: Dict[str, float] = {}
+        self.fired = 0
+    
+    def add_rule(self, symbol: str, level: float, direction: CrossDirection = CrossDirection.BOTH,
+                 action: Optional[Callable] = None, one_shot: bool = False) -> TriggerRule:
+        rule = TriggerRule(symbol, level, direction, action, one_shot)
+        index = self._indexes.get(symbol)
+        if index is None:
+            index = self._indexes[symbol] = _LevelIndex()
+        index.add(rule)
+        return rule
+    
+    def remove_rule(self, rule: TriggerRule):
+        rule.active = False
+        index = self._indexes.get(rule.symbol)
+        if index is not None:
+            index.remove(rule)
+            if not index:
+                del self._indexes[rule.symbol]
+    
+    def rule_count(self, symbol: str) -> int:
+        index = self._indexes.get(symbol)
+        return sum(len(bucket) for bucket in index.rules.values()) if index else 0
+    
+    def set_reference_price(self, stock_symbol: str, price: float):
+        self._last_prices[stock_symbol] = price
+    
+    def update(self, stock_symbol: str, price: float, output_file=None):
+        old_price = self._last_prices.get(stock_symbol)
+        self._last_prices[stock_symbol] = price
+        if old_price is None or old_price == price:
+            return
+        index = self._indexes.get(stock_symbol)
+        if index is None:
+            return
+        
+        levels = index.levels
+        if price > old_price:
+            direction = CrossDirection.UP
+            crossed = levels[bisect_right(levels, old_price):bisect_right(levels, price)]
+        else:
+            direction = CrossDirection.DOWN
+            crossed = levels[bisect_left(levels, price):bisect_left(levels, old_price)]
+            crossed.reverse()
+        
+        expired = []
+        for level in crossed:
+            for rule in index.rules[level]:
+                if not rule.matches(direction):
+                    continue
+                self.fired += 1
+                self._fire(rule, stock_symbol, price, direction, output_file)
+                if rule.one_shot:
+                    expired.append(rule)
+        for rule in expired:
+            self.remove_rule(rule)
+    
+    def _fire(self, rule: TriggerRule, stock_symbol: str, price: float,
+              direction: CrossDirection, output_file=None):
+        if rule.action is not None:
+            rule.action(rule, stock_symbol, price, direction, output_file)
+            return
+        message = f"[Trigger] {stock_symbol} crossed {direction.value} through ${rule.level:.2f} at ${price:.2f}"
+        emit(output_file or self.sink, message)
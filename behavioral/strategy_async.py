@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, List, Optional
+import asyncio
+import collections
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
+
+class GatewayConnection:
+    # One keep-alive connection speaking a line protocol: "PAY <method> <amount>"
+    # answered by "OK" or an error line.
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+    
+    @property
+    def closed(self) -> bool:
+        return self._writer.is_closing() or self._reader.at_eof()
+    
+    async def request(self, line: str) -> str:
+        self._writer.write(line.encode() + b"\n")
+        await self._writer.drain()
+        response = await self._reader.readline()
+        if not response:
+            raise ConnectionError("Gateway closed the connection")
+        return response.decode().strip()
+    
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def _open_connection(host: str, port: int) -> GatewayConnection:
+    reader, writer = await asyncio.open_connection(host, port)
+    return GatewayConnection(reader, writer)
+
+class ConnectionPool:
+    # Keep-alive pool shared by every strategy talking to the same gateway.
+    # At most max_connections are open at once; acquire() waits up to
+    # acquire_timeout seconds for one to free up.
+    def __init__(self, host: str, port: int, max_connections: int = 10, acquire_timeout: float = 5.0,
+                 opener: Optional[Callable[[str, int], Awaitable[GatewayConnection]]] = None):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self._opener = opener or _open_connection
+        self._idle: collections.deque = collections.deque()
+        self._slots = asyncio.Semaphore(max_connections)
+        self.opened = 0
+        self.reused = 0
+    
+    async def acquire(self) -> GatewayConnection:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No connection to {self.host}:{self.port} within {self.acquire_timeout}s")
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if not connection.closed:
+                    self.reused += 1
+                    return connection
+            connection = await self._opener(self.host, self.port)
+            self.opened += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    async def release(self, connection: GatewayConnection, reuse: bool = True):
+        try:
+            if reuse and not connection.closed:
+                self._idle.append(connection)
+            else:
+                await connection.close()
+        finally:
+            self._slots.release()
+    
+    @asynccontextmanager
+    async def connection(self):
+        connection = await self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            await self.release(connection, reuse=False)
+            raise
+        await self.release(connection)
+    
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+class AsyncPaymentStrategy(ABC):
+    sink = None
+    
+    @abstractmethod
+    async def process_payment(self, amount: float, output_file=None) -> bool:
+        pass
+
+class GatewayPaymentStrategy(AsyncPaymentStrategy):
+    method = "generic"
+    
+    def __init__(self, pool: ConnectionPool, sink=None):
+        self.pool = pool
+        self.sink = sink
+    
+    def describe(self, amount: float) -> str:
+        return f"Processing {self.method} payment of ${amount:.2f}"
+    
+    async def process_payment(self, amount: float, output_file=None) -> bool:
+        message = self.describe(amount)
+        emit(output_file or self.sink, message)
+        async with self.pool.connection() as connection:
+            response = await connection.request(f"PAY {self.method} {amount:.2f}")
+        return response == "OK"
+
+class AsyncCreditCardPayment(GatewayPaymentStrategy):
+    method = "card"
+    
+    def __init__(self, pool: ConnectionPool, card_number: str, expiry_date: str, cvv: str, sink=None):
+        super().__init__(pool, sink)
+        self.card_number = card_number
+        self.expiry_date = expiry_date
+        self.cvv = cvv
+    
+    def describe(self, amount: float) -> str:
+        return f"Processing credit card payment of ${amount:.2f}\nCard: ****-****-****-{self.card_number[-4:]}"
+
+class AsyncPayPalPayment(GatewayPaymentStrategy):
+    method = "paypal"
+    
+    def __init__(self, pool: ConnectionPool, email: str, sink=None):
+        super().__init__(pool, sink)
+        self.email = email
+    
+    def describe(self, amount: float) -> str:
+        return f"Processing PayPal payment of ${amount:.2f}\nEmail: {self.email}"
+
+class AsyncCryptoPayment(GatewayPaymentStrategy):
+    method = "crypto"
+    
+    def __init__(self, pool: ConnectionPool, wallet_address: str, sink=None):
+        super().__init__(pool, sink)
+        self.wallet_address = wallet_address
+    
+    def describe(self, amount: float) -> str:
+        return f"Processing cryptocurrency payment of ${amount:.2f}\nWallet: {self.wallet_address[:8]}...{self.wallet_address[-4:]}"
+
+class AsyncPaymentProcessor:
+    def __init__(self):
+        self._strategy = None
+    
+    def set_payment_strategy(self, strategy: AsyncPaymentStrategy):
+        self._strategy = strategy
+    
+    async def execute_payment(self, amount: float, output_file=None) -> bool:
+        if not self._strategy:
+            raise ValueError("Payment strategy not set")
+        return await self._strategy.process_payment(amount, output_file)
+    
+    async def execute_many(self, amounts: Iterable[float], concurrency: int = 1000,
+                           output_file=None) -> List[bool]:
+        # Results keep the order of amounts; a failed payment is reported as False
+        limit = asyncio.Semaphore(concurrency)
+        
+        async def run(amount: float) -> bool:
+            async with limit:
+                try:
+                    return await self.execute_payment(amount, output_file)
+                except (ConnectionError, TimeoutError):
+                    return False
+        
+        return list(await asyncio.gather(*(run(amount) for amount in amounts)))
@@ -1,60 +1,315 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import collections
+import heapq
 import os
+import queue
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
 
 class PaymentStrategy(ABC):
+    # Where messages go when process_payment() is not given an output_file
+    sink = None
+    
     @abstractmethod
     def process_payment(self, amount: float, output_file=None) -> bool:
         pass
 
 class CreditCardPayment(PaymentStrategy):
-    def __init__(self, card_number: str, expiry_date: str, cvv: str):
+    def __init__(self, card_number: str, expiry_date: str, cvv: str, sink=None):
         self.card_number = card_number
         self.expiry_date = expiry_date
         self.cvv = cvv
+        self.sink = sink
     
     def process_payment(self, amount: float, output_file=None) -> bool:
         message = f"Processing credit card payment of ${amount:.2f}\nCard: ****-****-****-{self.card_number[-4:]}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
         return True
 
 class PayPalPayment(PaymentStrategy):
-    def __init__(self, email: str):
+    def __init__(self, email: str, sink=None):
         self.email = email
+        self.sink = sink
     
     def process_payment(self, amount: float, output_file=None) -> bool:
         message = f"Processing PayPal payment of ${amount:.2f}\nEmail: {self.email}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
         return True
 
 class CryptoPayment(PaymentStrategy):
-    def __init__(self, wallet_address: str):
+    def __init__(self, wallet_address: str, sink=None):
         self.wallet_address = wallet_address
+        self.sink = sink
     
     def process_payment(self, amount: float, output_file=None) -> bool:
         message = f"Processing cryptocurrency payment of ${amount:.2f}\nWallet: {self.wallet_address[:8]}...{self.wallet_address[-4:]}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
         return True
 
+class IdempotencyCache:
+    # Remembers payment results by idempotency key. Entries expire after ttl
+    # seconds and the least recently used ones are evicted beyond max_entries.
+    # Concurrent calls with the same key are single-flight: one runs the
+    # payment, the others wait for its result. Failures are not cached:
+    # an exception or a declined (falsy) result lets the next call retry.
+    # A key reused with a different fingerprint (e.g. another strategy or
+    # amount) raises ValueError instead of replaying the earlier result.
+    def __init__(self, max_entries: int = 100_000, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "collections.OrderedDict[str, Tuple[float, bool, Any]]" = collections.OrderedDict()
+        self._in_flight: Dict[str, Tuple[threading.Event, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_or_execute(self, key: str, execute: Callable[[], bool], fingerprint: Any = None) -> bool:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > self._clock():
+                        self._check_fingerprint(key, entry[2], fingerprint)
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry[1]
+                    del self._entries[key]
+                    self.expirations += 1
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    event = threading.Event()
+                    self._in_flight[key] = (event, fingerprint)
+                    self.misses += 1
+                else:
+                    event = flight[0]
+                    self._check_fingerprint(key, flight[1], fingerprint)
+                    self.coalesced += 1
+            if not leader:
+                # Re-check once the in-progress call finishes; if it failed or
+                # was declined this caller takes over as the leader.
+                event.wait()
+                continue
+            try:
+                result = execute()
+            except BaseException:
+                with self._lock:
+                    del self._in_flight[key]
+                event.set()
+                raise
+            with self._lock:
+                if result:
+                    self._store(key, result, fingerprint)
+                del self._in_flight[key]
+            event.set()
+            return result
+    
+    @staticmethod
+    def _check_fingerprint(key: str, stored: Any, fingerprint: Any):
+        if stored != fingerprint:
+            raise ValueError(f"Idempotency key {key!r} was already used for a different request")
+    
+    def _store(self, key: str, result: bool, fingerprint: Any = None):
+        now = self._clock()
+        entries = self._entries
+        entries[key] = (now + self.ttl, result, fingerprint)
+        entries.move_to_end(key)
+        while entries:
+            oldest_key, (expires, _, _) = next(iter(entries.items()))
+            if expires <= now:
+                del entries[oldest_key]
+                self.expirations += 1
+            elif len(entries) > self.max_entries:
+                del entries[oldest_key]
+                self.evictions += 1
+            else:
+                break
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
 class PaymentProcessor:
-    def __init__(self):
+    def __init__(self, idempotency_cache: Optional[IdempotencyCache] = None):
         self._strategy = None
+        self._idempotency_cache = idempotency_cache
     
     def set_payment_strategy(self, strategy: PaymentStrategy):
         self._strategy = strategy
     
-    def execute_payment(self, amount: float, output_file=None) -> bool:
+    def execute_payment(self, amount: float, output_file=None, idempotency_key: Optional[str] = None) -> bool:
         if not self._strategy:
             raise ValueError("Payment strategy not set")
-        return self._strategy.process_payment(amount, output_file)
+        if idempotency_key is None or self._idempotency_cache is None:
+            return self._strategy.process_payment(amount, output_file)
+        strategy = self._strategy
+        return self._idempotency_cache.get_or_execute(
+            idempotency_key, lambda: strategy.process_payment(amount, output_file), (strategy, amount))
+    
+    def execute_batch(self, jobs: Iterable[Tuple[PaymentStrategy, float]], max_workers: int = 8,
+                      per_strategy_limit: int = 4, strategy_limits: Optional[Dict[PaymentStrategy, int]] = None,
+                      ordered: bool = True, output_file=None, window: Optional[int] = None) -> "PaymentBatch":
+        return PaymentBatch(jobs, max_workers, per_strategy_limit, strategy_limits or {}, ordered, output_file,
+                            window)
+
+class PaymentResult:
+    __slots__ = ("index", "strategy", "amount", "success", "error", "elapsed")
+    
+    def __init__(self, index: int, strategy: PaymentStrategy, amount: float, success: bool,
+                 error: Optional[BaseException], elapsed: float):
+        self.index = index
+        self.strategy = strategy
+        self.amount = amount
+        self.success = success
+        self.error = error
+        self.elapsed = elapsed
+
+class StrategyStats:
+    def __init__(self, strategy: PaymentStrategy):
+        self.strategy = strategy
+        self.name = type(strategy).__name__
+        self.processed = 0
+        self.failures = 0
+        self.busy_time = 0.0
+        self.first_start: Optional[float] = None
+        self.last_finish: Optional[float] = None
+    
+    @property
+    def throughput(self) -> float:
+        # Payments per second of wall time this strategy was active
+        if self.first_start is None or self.last_finish is None or self.last_finish <= self.first_start:
+            return 0.0
+        return self.processed / (self.last_finish - self.first_start)
+    
+    def __str__(self):
+        return (f"{self.name}: {self.processed} processed, {self.failures} failed, "
+                f"{self.throughput:.1f} payments/s")
+
+class PaymentBatch:
+    # Jobs are read lazily and run one task per payment on a shared thread
+    # pool. Each strategy has at most its concurrency limit of payments in
+    # flight; jobs beyond that wait in a per-strategy backlog, so a busy or
+    # slow strategy never holds up the others. At most `window` jobs are read
+    # but not yet yielded, which also bounds the reorder buffer in ordered
+    # mode. Iterate the batch to receive PaymentResults, in job order or as
+    # they complete.
+    def __init__(self, jobs: Iterable[Tuple[PaymentStrategy, float]], max_workers: int,
+                 per_strategy_limit: int, strategy_limits: Dict[PaymentStrategy, int],
+                 ordered: bool, output_file=None, window: Optional[int] = None):
+        self._jobs = jobs
+        self.total = 0
+        self.stats: Dict[PaymentStrategy, StrategyStats] = {}
+        self._max_workers = max_workers
+        self._per_strategy_limit = per_strategy_limit
+        self._strategy_limits = strategy_limits
+        self._ordered = ordered
+        self._output_file = output_file
+        self._window = max(1, window or max_workers * 16)
+        self._results: "queue.SimpleQueue[PaymentResult]" = queue.SimpleQueue()
+        self._stats_lock = threading.Lock()
+        self._started = False
+    
+    def _process(self, strategy: PaymentStrategy, index: int, amount: float):
+        stats = self.stats[strategy]
+        start = time.perf_counter()
+        error = None
+        try:
+            success = bool(strategy.process_payment(amount, self._output_file))
+        except Exception as exc:
+            success = False
+            error = exc
+        finish = time.perf_counter()
+        with self._stats_lock:
+            stats.processed += 1
+            stats.failures += not success
+            stats.busy_time += finish - start
+            if stats.first_start is None or start < stats.first_start:
+                stats.first_start = start
+            if stats.last_finish is None or finish > stats.last_finish:
+                stats.last_finish = finish
+        self._results.put(PaymentResult(index, strategy, amount, success, error, finish - start))
+    
+    def __iter__(self) -> Iterator[PaymentResult]:
+        if self._started:
+            raise RuntimeError("A payment batch can only be iterated once")
+        self._started = True
+        jobs = enumerate(self._jobs)
+        in_flight: Dict[PaymentStrategy, int] = {}
+        backlog: Dict[PaymentStrategy, collections.deque] = {}
+        # Reorder buffer: hold early finishers until their turn comes
+        pending: List[Tuple[int, int, PaymentResult]] = []
+        next_index = 0
+        read = 0
+        finished = 0
+        exhausted = False
+        
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while True:
+                while not exhausted and read - next_index < self._window:
+                    job = next(jobs, None)
+                    if job is None:
+                        exhausted = True
+                        break
+                    index, (strategy, amount) = job
+                    read += 1
+                    self.total = read
+                    if strategy not in self.stats:
+                        self.stats[strategy] = StrategyStats(strategy)
+                        in_flight[strategy] = 0
+                        backlog[strategy] = collections.deque()
+                    if in_flight[strategy] < max(1, self._strategy_limits.get(strategy, self._per_strategy_limit)):
+                        in_flight[strategy] += 1
+                        executor.submit(self._process, strategy, index, amount)
+                    else:
+                        backlog[strategy].append((index, amount))
+                
+                if finished == read:
+                    if exhausted:
+                        return
+                    continue
+                result = self._results.get()
+                finished += 1
+                strategy = result.strategy
+                if backlog[strategy]:
+                    executor.submit(self._process, strategy, *backlog[strategy].popleft())
+                else:
+                    in_flight[strategy] -= 1
+                
+                if not self._ordered:
+                    next_index += 1
+                    yield result
+                    continue
+                heapq.heappush(pending, (result.index, id(result), result))
+                while pending and pending[0][0] == next_index:
+                    yield heapq.heappop(pending)[2]
+                    next_index += 1
+    
+    def run(self) -> List[PaymentResult]:
+        return list(self)
+    
+    @property
+    def failures(self) -> int:
+        return sum(stats.failures for stats in self.stats.values())
 
 def demo_strategy(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
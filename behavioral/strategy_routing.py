@@ -0,0 +1,162 @@
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+import collections
+import math
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.strategy_payment import PaymentStrategy
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class RouteHealth:
+    # Rolling latency and error window for one payment rail plus its circuit
+    # breaker state.
+    def __init__(self, strategy: PaymentStrategy, cost: float = 0.0, window: int = 200):
+        self.strategy = strategy
+        self.cost = cost
+        self.latencies: collections.deque = collections.deque(maxlen=window)
+        self.outcomes: collections.deque = collections.deque(maxlen=window)
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self._sorted: Optional[List[float]] = None
+    
+    def record(self, latency: float, success: bool):
+        self.latencies.append(latency)
+        self.outcomes.append(success)
+        self._sorted = None
+        if success:
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+    
+    def reset_window(self):
+        self.latencies.clear()
+        self.outcomes.clear()
+        self.consecutive_failures = 0
+        self._sorted = None
+    
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        if self._sorted is None:
+            self._sorted = sorted(self.latencies)
+        index = min(len(self._sorted) - 1, math.ceil(percentile * len(self._sorted)) - 1)
+        return self._sorted[max(0, index)]
+    
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+class AdaptiveRoutingStrategy(PaymentStrategy):
+    # Picks a rail per payment by score = latency percentile * latency_weight
+    # + error rate * error_penalty + cost, falling over to the next best rail
+    # on failure. Rails whose error rate or consecutive failures cross the
+    # thresholds are taken out of rotation; after cooldown seconds one probe
+    # payment is let through to decide whether to close the circuit again.
+    def __init__(self, percentile: float = 0.99, latency_weight: float = 1.0, error_penalty: float = 1.0,
+                 failure_threshold: float = 0.5, min_samples: int = 20, max_consecutive_failures: int = 5,
+                 cooldown: float = 5.0, max_attempts: int = 2, window: int = 200,
+                 clock: Callable[[], float] = time.monotonic):
+        self.percentile = percentile
+        self.latency_weight = latency_weight
+        self.error_penalty = error_penalty
+        self.failure_threshold = failure_threshold
+        self.min_samples = min_samples
+        self.max_consecutive_failures = max_consecutive_failures
+        self.cooldown = cooldown
+        self.max_attempts = max_attempts
+        self.window = window
+        self._clock = clock
+        self._routes: List[RouteHealth] = []
+        self._lock = threading.Lock()
+    
+    def add_strategy(self, strategy: PaymentStrategy, cost: float = 0.0) -> RouteHealth:
+        health = RouteHealth(strategy, cost, self.window)
+        self._routes.append(health)
+        return health
+    
+    def health(self, strategy: PaymentStrategy) -> RouteHealth:
+        for health in self._routes:
+            if health.strategy is strategy:
+                return health
+        raise KeyError(strategy)
+    
+    def _score(self, health: RouteHealth) -> float:
+        return (health.latency_percentile(self.percentile) * self.latency_weight
+                + health.error_rate * self.error_penalty + health.cost)
+    
+    def _candidates(self) -> List[RouteHealth]:
+        now = self._clock()
+        probes = []
+        healthy = []
+        with self._lock:
+            for health in self._routes:
+                if health.state == CircuitState.OPEN and now - health.opened_at >= self.cooldown:
+                    health.state = CircuitState.HALF_OPEN
+                if health.state == CircuitState.HALF_OPEN and not health.probing and not probes:
+                    # One probe per payment, tried before the healthy rails
+                    health.probing = True
+                    probes.append(health)
+                elif health.state == CircuitState.CLOSED:
+                    healthy.append(health)
+            ranked = probes + sorted(healthy, key=self._score)
+            if not ranked:
+                # Every rail is tripped: try the least bad one rather than refuse
+                ranked = sorted(self._routes, key=self._score)
+        return ranked
+    
+    def _record(self, health: RouteHealth, latency: float, success: bool):
+        with self._lock:
+            health.record(latency, success)
+            if health.state == CircuitState.HALF_OPEN:
+                health.probing = False
+                if success:
+                    health.state = CircuitState.CLOSED
+                    health.reset_window()
+                    health.record(latency, success)
+                else:
+                    health.state = CircuitState.OPEN
+                    health.opened_at = self._clock()
+            elif health.state == CircuitState.CLOSED and (
+                    health.consecutive_failures >= self.max_consecutive_failures
+                    or (len(health.outcomes) >= self.min_samples and health.error_rate >= self.failure_threshold)):
+                health.state = CircuitState.OPEN
+                health.opened_at = self._clock()
+    
+    def process_payment(self, amount: float, output_file=None) -> bool:
+        if not self._routes:
+            raise ValueError("No payment strategies configured for routing")
+        for health in self._candidates()[:self.max_attempts]:
+            start = time.perf_counter()
+            try:
+                success = bool(health.strategy.process_payment(amount, output_file))
+            except Exception:
+                success = False
+            self._record(health, time.perf_counter() - start, success)
+            if success:
+                return True
+        return False
+    
+    def report(self) -> Dict[str, Dict[str, object]]:
+        return {
+            f"{type(health.strategy).__name__}#{i}": {
+                "state": health.state.value,
+                "p_latency": health.latency_percentile(self.percentile),
+                "error_rate": health.error_rate,
+                "cost": health.cost,
+            }
+            for i, health in enumerate(self._routes)
+        }
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.adapter_media import UniversalMediaPlayer
+
+# Dispatch a playlist across 50 formats through UniversalMediaPlayer, with
+# callers spelling formats as keys, upper-case keys, MIME types and
+# extensions. Output goes to a null file so only dispatch is measured.
+
+class NullFile:
+    def write(self, text):
+        pass
+
+def _null_handler(filename, output_file=None):
+    pass
+
+def run(entries=1_000_000, formats=50):
+    player = UniversalMediaPlayer()
+    for i in range(formats - 4):
+        player.formats.register(f"fmt{i}", _null_handler,
+                                mime_types=[f"audio/x-fmt{i}"], extensions=[f".fmt{i}"])
+    spellings = []
+    for i in range(formats):
+        key = ["mp3", "wav", "vlc", "mp4"][i] if i < 4 else f"fmt{i - 4}"
+        spellings += [key, key.upper(), f".{key}"]
+    playlist = [(spellings[i % len(spellings)], f"track{i}") for i in range(entries)]
+    out = NullFile()
+    
+    start = time.perf_counter()
+    for audio_type, filename in playlist:
+        player.formats.resolve(audio_type)
+    elapsed = time.perf_counter() - start
+    print(f"resolve only : {elapsed:.2f}s ({entries / elapsed / 1e6:.2f}M lookups/s)")
+    
+    start = time.perf_counter()
+    for audio_type, filename in playlist:
+        player.play(audio_type, filename, out)
+    elapsed = time.perf_counter() - start
+    print(f"play         : {elapsed:.2f}s ({entries / elapsed / 1e6:.2f}M entries/s, "
+          f"{len(player.formats.formats())} registered keys)")
+
+if __name__ == "__main__":
+    run()
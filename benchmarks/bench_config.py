@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.singleton_config import ConfigurationManager
+
+# Read-heavy load: several threads call get_all_config() and get() in a loop
+# while one thread keeps writing. Compares the copy-on-read implementation
+# this module used to have with the snapshot-based one.
+
+class LegacyConfigurationManager:
+    def __init__(self, config):
+        self._config = dict(config)
+    
+    def get(self, key):
+        return self._config.get(key)
+    
+    def set(self, key, value):
+        self._config[key] = value
+    
+    def get_all_config(self):
+        return self._config.copy()
+
+def _load(manager, readers, reads, writes):
+    stop = threading.Event()
+    
+    def read():
+        for _ in range(reads):
+            config = manager.get_all_config()
+            config.get("timeout")
+            manager.get("api_key")
+    
+    def write():
+        i = 0
+        while not stop.is_set() and i < writes:
+            manager.set("timeout", i)
+            i += 1
+            time.sleep(0.001)
+    
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer = threading.Thread(target=write)
+    start = time.perf_counter()
+    writer.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    writer.join()
+    return elapsed
+
+def run(keys=1_000, readers=4, reads=20_000, writes=1_000):
+    config = ConfigurationManager()
+    config.update({f"setting_{i}": i for i in range(keys)})
+    legacy = LegacyConfigurationManager(config.get_all_config())
+    
+    legacy_time = _load(legacy, readers, reads, writes)
+    snapshot_time = _load(config, readers, reads, writes)
+    total = readers * reads
+    print(f"config keys={len(config.get_all_config())} readers={readers}")
+    print(f"copy on read : {legacy_time:.2f}s ({total / legacy_time:,.0f} reads/s)")
+    print(f"snapshots    : {snapshot_time:.2f}s ({total / snapshot_time:,.0f} reads/s)")
+
+if __name__ == "__main__":
+    run()
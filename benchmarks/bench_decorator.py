@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.decorator_coffee import (CaramelDecorator, MilkDecorator, SimpleCoffee,
+                                         SugarDecorator)
+
+# Builds decorator chains of growing depth and queries cost and description,
+# comparing the flattened decorators against the original recursive ones.
+
+class RecursiveDecorator:
+    delta = 0.0
+    suffix = ""
+    
+    def __init__(self, coffee):
+        self._coffee = coffee
+    
+    def get_cost(self):
+        return self._coffee.get_cost() + self.delta
+    
+    def get_description(self):
+        return self._coffee.get_description() + self.suffix
+
+class RecursiveMilk(RecursiveDecorator):
+    delta, suffix = 0.50, ", milk"
+
+class RecursiveSugar(RecursiveDecorator):
+    delta, suffix = 0.25, ", sugar"
+
+class RecursiveCaramel(RecursiveDecorator):
+    delta, suffix = 1.00, ", caramel"
+
+def _measure(decorators, depth, queries):
+    start = time.perf_counter()
+    coffee = SimpleCoffee()
+    for i in range(depth):
+        coffee = decorators[i % 3](coffee)
+    for _ in range(queries):
+        coffee.get_cost()
+        coffee.get_description()
+    return time.perf_counter() - start
+
+def run(depths=(10, 100, 500, 5_000, 50_000), queries=1_000):
+    flattened = (MilkDecorator, SugarDecorator, CaramelDecorator)
+    recursive = (RecursiveMilk, RecursiveSugar, RecursiveCaramel)
+    for depth in depths:
+        fast = _measure(flattened, depth, queries)
+        try:
+            slow = f"{_measure(recursive, depth, queries):.4f}s"
+        except RecursionError:
+            slow = "RecursionError"
+        print(f"depth {depth:>6}: flattened {fast:.4f}s, recursive {slow} ({queries} queries)")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.factory_vehicles import Car, Motorcycle, Truck, VehicleFactory, VehicleType
+
+# Startup: importing N plugin modules eagerly versus registering them lazily.
+# Dispatch: registry lookup versus the old if/elif chain, with few and many
+# registered types.
+
+PLUGIN_TEMPLATE = textwrap.dedent("""
+    import json, decimal, fractions, statistics
+    from creational.factory_vehicles import Vehicle
+
+    class Plugin{i}(Vehicle):
+        def __init__(self, model):
+            self.model = model
+        def start_engine(self, output_file=None):
+            pass
+        def stop_engine(self, output_file=None):
+            pass
+""")
+
+def legacy_create_vehicle(vehicle_type, model):
+    if vehicle_type == VehicleType.CAR:
+        return Car(model)
+    elif vehicle_type == VehicleType.MOTORCYCLE:
+        return Motorcycle(model)
+    elif vehicle_type == VehicleType.TRUCK:
+        return Truck(model)
+    else:
+        raise ValueError(f"Unknown vehicle type: {vehicle_type}")
+
+def _startup(plugin_dir, plugin_count, lazy):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if lazy:
+        body = "\n".join(f"VehicleFactory.register('plugin{i}', 'plugin{i}:Plugin{i}')" for i in range(plugin_count))
+    else:
+        body = "\n".join(f"import plugin{i}; VehicleFactory.register('plugin{i}', plugin{i}.Plugin{i})"
+                         for i in range(plugin_count))
+    script = (f"import sys, time\nstart = time.perf_counter()\nsys.path[:0] = [{root!r}, {plugin_dir!r}]\n"
+              "from creational.factory_vehicles import VehicleFactory\n"
+              f"{body}\nVehicleFactory.create_vehicle('plugin0', 'x')\n"
+              "print(time.perf_counter() - start)")
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return float(output.stdout)
+
+def run(plugin_count=50, calls=200_000):
+    with tempfile.TemporaryDirectory() as plugin_dir:
+        for i in range(plugin_count):
+            with open(os.path.join(plugin_dir, f"plugin{i}.py"), "w") as f:
+                f.write(PLUGIN_TEMPLATE.format(i=i))
+        eager = min(_startup(plugin_dir, plugin_count, lazy=False) for _ in range(3))
+        lazy = min(_startup(plugin_dir, plugin_count, lazy=True) for _ in range(3))
+    print(f"startup with {plugin_count} plugins: eager={eager * 1000:.1f}ms lazy={lazy * 1000:.1f}ms")
+    
+    legacy = timeit.timeit(lambda: legacy_create_vehicle(VehicleType.TRUCK, "x"), number=calls)
+    registry = timeit.timeit(lambda: VehicleFactory.create_vehicle(VehicleType.TRUCK, "x"), number=calls)
+    print(f"dispatch (3 types)  : if/elif={legacy / calls * 1e9:.0f}ns registry={registry / calls * 1e9:.0f}ns")
+    
+    for i in range(plugin_count):
+        VehicleFactory.register(f"bench{i}", type(f"Bench{i}", (Car,), {}))
+    crowded = timeit.timeit(lambda: VehicleFactory.create_vehicle(VehicleType.TRUCK, "x"), number=calls)
+    print(f"dispatch ({plugin_count + 3} types) : registry={crowded / calls * 1e9:.0f}ns")
+    for i in range(plugin_count):
+        VehicleFactory.unregister(f"bench{i}")
+
+if __name__ == "__main__":
+    run()
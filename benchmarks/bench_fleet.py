@@ -0,0 +1,47 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.factory_fleet import create_many
+from creational.factory_vehicles import VehicleFactory, VehicleType
+
+# Memory and build time for a fleet built one object at a time through
+# VehicleFactory versus the column-wise Fleet.
+
+MODELS = {
+    VehicleType.CAR: ["Toyota Camry", "Honda Civic", "Tesla Model 3", "Ford Focus"],
+    VehicleType.MOTORCYCLE: ["Harley Davidson", "Ducati Monster", "Yamaha R1"],
+    VehicleType.TRUCK: ["Ford F-150", "Volvo FH", "Scania R500"],
+}
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+def run(count=500_000, seed=1):
+    rng = random.Random(seed)
+    types = list(MODELS)
+    rows = []
+    for _ in range(count):
+        vehicle_type = rng.choice(types)
+        rows.append((vehicle_type, rng.choice(MODELS[vehicle_type])))
+    
+    objects, object_time, object_bytes = _measure(
+        lambda: [VehicleFactory.create_vehicle(vehicle_type, model) for vehicle_type, model in rows])
+    del objects
+    fleet, fleet_time, fleet_bytes = _measure(lambda: create_many(rows))
+    
+    print(f"objects: {object_time:.2f}s, {object_bytes / count:.1f} bytes/vehicle")
+    print(f"fleet  : {fleet_time:.2f}s, {fleet_bytes / count:.1f} bytes/vehicle")
+    print(f"memory reduction: {object_bytes / fleet_bytes:.1f}x, speedup: {object_time / fleet_time:.1f}x")
+
+if __name__ == "__main__":
+    run()
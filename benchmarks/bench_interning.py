@@ -0,0 +1,48 @@
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.decorator_coffee import SimpleCoffee
+from structural.decorator_interning import DrinkInterner
+from structural.decorator_pricing import DEFAULT_TOPPINGS
+
+# Builds an order stream drawn from a few hundred drink configurations and
+# keeps every order's drink, once building fresh decorator chains and once
+# through the interner, comparing time and memory held by the orders.
+
+def _menu(configurations, rng):
+    return [[rng.choice(DEFAULT_TOPPINGS) for _ in range(rng.randint(1, 5))] for _ in range(configurations)]
+
+def _fresh(toppings):
+    coffee = SimpleCoffee()
+    for topping in toppings:
+        coffee = topping(coffee)
+    return coffee
+
+def run(orders=200_000, configurations=300, seed=9):
+    rng = random.Random(seed)
+    menu = _menu(configurations, rng)
+    stream = [rng.choice(menu) for _ in range(orders)]
+    interner = DrinkInterner()
+    
+    for name, build in (("fresh", _fresh), ("interned", interner.build)):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        drinks = [build(toppings) for toppings in stream]
+        for drink in drinks:
+            drink.get_description()
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<9}: {elapsed:.2f}s, {current / 1e6:.1f} MB held, "
+              f"{len(set(map(id, drinks))):,} distinct drink objects")
+        del drinks
+    print(interner.stats())
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,46 @@
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_journal import TickJournal
+from behavioral.observer_stock_market import StockObserver
+
+# Appends a synthetic trading day of ticks and replays it tick by tick and in
+# batches into an observer that only counts what it receives.
+
+class CountingObserver(StockObserver):
+    def __init__(self):
+        self.ticks = 0
+    
+    def update(self, stock_symbol: str, price: float, output_file=None):
+        self.ticks += 1
+    
+    def update_batch(self, symbols, prices, output_file=None):
+        self.ticks += len(symbols)
+
+def run(symbol_count=2_000, tick_count=1_000_000, seed=11):
+    rng = random.Random(seed)
+    symbols = [f"SYM{i:05d}" for i in range(symbol_count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with TickJournal(os.path.join(tmp, "day.bin")) as journal:
+            start = time.perf_counter()
+            timestamp = time.time_ns()
+            for i in range(tick_count):
+                journal.append(rng.choice(symbols), 100.0 + rng.random(), timestamp + i)
+            append_time = time.perf_counter() - start
+            print(f"append : {tick_count:,} ticks in {append_time:.2f}s")
+            
+            for batch_size in (None, 10_000):
+                observer = CountingObserver()
+                start = time.perf_counter()
+                journal.replay([observer], batch_size=batch_size)
+                elapsed = time.perf_counter() - start
+                mode = "per tick" if batch_size is None else f"batch={batch_size}"
+                print(f"replay ({mode}): {observer.ticks:,} ticks in {elapsed:.2f}s "
+                      f"({observer.ticks / elapsed:,.0f} ticks/s)")
+
+if __name__ == "__main__":
+    run()
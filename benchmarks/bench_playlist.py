@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.adapter_media import UniversalMediaPlayer
+from structural.adapter_playlist import PlaylistEngine
+from structural.adapter_streaming import StreamingMediaPlayer
+
+# Streams a playlist of real files through StreamingMediaPlayer against a
+# simulated slow filesystem where every open waits a few milliseconds, once
+# sequentially and then through PlaylistEngine with growing prefetch windows.
+# The adapters decode every byte, so both paths do the same I/O.
+
+HEADERS = {"mp3": b"ID3\x04\x00", "wav": b"RIFF\x00\x00\x00\x00WAVEfmt ", "mp4": b"\x00\x00\x00\x18ftypisom"}
+
+class SlowFilesystemStreamer(StreamingMediaPlayer):
+    def __init__(self, *args, latency=0.004, jitter=0.004, seed=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+    
+    def _open(self, path):
+        time.sleep(self.latency + self._rng.random() * self.jitter)
+        return super()._open(path)
+
+class NullFile:
+    def write(self, text):
+        pass
+
+def run(items=600, file_size=256 * 1024):
+    formats = list(HEADERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        playlist = []
+        for i in range(items):
+            audio_type = formats[i % len(formats)]
+            path = os.path.join(tmp, f"track{i}.{audio_type}")
+            with open(path, "wb") as f:
+                f.write(HEADERS[audio_type] + os.urandom(file_size))
+            playlist.append((audio_type, path))
+        out = NullFile()
+        
+        streamer = SlowFilesystemStreamer(UniversalMediaPlayer(), chunk_size=64 * 1024)
+        start = time.perf_counter()
+        for audio_type, path in playlist:
+            streamer.stream(path, audio_type, out)
+        sequential = time.perf_counter() - start
+        print(f"sequential  : {sequential:.2f}s")
+        
+        for prefetch in (2, 8, 32):
+            player = UniversalMediaPlayer()
+            streamer = SlowFilesystemStreamer(player, chunk_size=64 * 1024)
+            stats = PlaylistEngine(streamer, prefetch=prefetch).play(playlist, out)
+            decoded = sum(player.legacy_adapter.legacy_player.bytes_decoded.values())
+            decoded += sum(player.advanced_adapter.advanced_player.bytes_decoded.values())
+            print(f"prefetch={prefetch:<3}: {stats.elapsed:.2f}s ({sequential / stats.elapsed:.1f}x, "
+                  f"stalled {stats.stall_seconds:.2f}s, max buffered {stats.max_buffered}, "
+                  f"{decoded / 1e6:.0f} MB decoded)")
+
+if __name__ == "__main__":
+    run()
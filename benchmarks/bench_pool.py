@@ -0,0 +1,43 @@
+import gc
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.factory_pool import ThreadSafeVehiclePool, VehiclePool
+from creational.factory_vehicles import VehicleFactory, VehicleType
+
+# Create / start / stop / discard cycles through the plain factory and
+# through the pools, writing engine messages to a null file.
+
+class NullFile:
+    def write(self, text):
+        pass
+
+def run(cycles=300_000):
+    types = [VehicleType.CAR, VehicleType.MOTORCYCLE, VehicleType.TRUCK]
+    out = NullFile()
+    
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(cycles):
+        vehicle = VehicleFactory.create_vehicle(types[i % 3], "Model")
+        vehicle.start_engine(out)
+        vehicle.stop_engine(out)
+    plain = time.perf_counter() - start
+    print(f"factory          : {plain:.2f}s")
+    
+    for pool in (VehiclePool(), ThreadSafeVehiclePool()):
+        gc.collect()
+        start = time.perf_counter()
+        for i in range(cycles):
+            vehicle = pool.acquire(types[i % 3], "Model")
+            vehicle.start_engine(out)
+            vehicle.stop_engine(out)
+            pool.release(vehicle)
+        elapsed = time.perf_counter() - start
+        print(f"{type(pool).__name__:<17}: {elapsed:.2f}s (hit rate {pool.hit_rate:.1%}, "
+              f"{plain / elapsed:.2f}x)")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.decorator_coffee import SimpleCoffee
+from structural.decorator_pricing import DEFAULT_TOPPINGS, BulkPricer, ToppingMatrix
+
+# Prices a synthetic order history drawn from a few hundred drink
+# configurations, once by building decorator chains and once in bulk, and
+# checks both agree to the cent.
+
+def run(orders=1_000_000, configurations=300, seed=5):
+    rng = random.Random(seed)
+    menu = [tuple(rng.choice((0, 0, 0, 1, 1, 2)) for _ in DEFAULT_TOPPINGS) for _ in range(configurations)]
+    rows = [rng.choice(menu) for _ in range(orders)]
+    
+    start = time.perf_counter()
+    object_totals = []
+    for row in rows:
+        coffee = SimpleCoffee()
+        for topping, count in zip(DEFAULT_TOPPINGS, row):
+            for _ in range(count):
+                coffee = topping(coffee)
+        object_totals.append(coffee.get_cost())
+    object_time = time.perf_counter() - start
+    print(f"object path : {object_time:.2f}s")
+    
+    matrix = ToppingMatrix.from_rows(rows)
+    pricer = BulkPricer()
+    start = time.perf_counter()
+    cents = pricer.totals_cents(matrix)
+    bulk_time = time.perf_counter() - start
+    print(f"bulk totals : {bulk_time:.2f}s ({object_time / bulk_time:.0f}x)")
+    
+    start = time.perf_counter()
+    pricer.descriptions(matrix)
+    print(f"descriptions: {time.perf_counter() - start:.2f}s")
+    
+    mismatches = sum(f"{a:.2f}" != f"{b / 100:.2f}" for a, b in zip(object_totals, cents))
+    print(f"mismatches  : {mismatches}")
+
+if __name__ == "__main__":
+    run()
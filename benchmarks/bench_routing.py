@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.strategy_payment import PaymentProcessor, PaymentStrategy
+from behavioral.strategy_routing import AdaptiveRoutingStrategy
+
+# Simulates a partial outage: the preferred card rail turns slow and flaky
+# halfway through. Compares sending everything to that rail with adaptive
+# routing across three rails of different latency and cost.
+
+class SimulatedRail(PaymentStrategy):
+    def __init__(self, name, latency, rng):
+        self.name = name
+        self.latency = latency
+        self.error_rate = 0.0
+        self.rng = rng
+    
+    def process_payment(self, amount: float, output_file=None) -> bool:
+        time.sleep(self.latency * (0.5 + self.rng.random()))
+        if self.rng.random() < self.error_rate:
+            raise ConnectionError(f"{self.name} unavailable")
+        return True
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+def _run(processor, card, payments):
+    latencies = []
+    failures = 0
+    for i in range(payments):
+        if i == payments // 2:
+            card.latency = 0.030
+            card.error_rate = 0.3
+        start = time.perf_counter()
+        if not processor.execute_payment(10.0):
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, failures
+
+def _rails(seed):
+    rng = random.Random(seed)
+    return (SimulatedRail("card", 0.001, rng), SimulatedRail("paypal", 0.002, rng),
+            SimulatedRail("crypto", 0.004, rng))
+
+def _safe(strategy):
+    class Safe(PaymentStrategy):
+        def process_payment(self, amount: float, output_file=None) -> bool:
+            try:
+                return strategy.process_payment(amount, output_file)
+            except ConnectionError:
+                return False
+    return Safe()
+
+def run(payments=1_000, seed=5):
+    card, _, _ = _rails(seed)
+    fixed = PaymentProcessor()
+    fixed.set_payment_strategy(_safe(card))
+    fixed_latencies, fixed_failures = _run(fixed, card, payments)
+    
+    card, paypal, crypto = _rails(seed)
+    router = AdaptiveRoutingStrategy(cooldown=0.5, min_samples=10)
+    router.add_strategy(card, cost=0.0)
+    router.add_strategy(paypal, cost=0.001)
+    router.add_strategy(crypto, cost=0.002)
+    adaptive = PaymentProcessor()
+    adaptive.set_payment_strategy(router)
+    adaptive_latencies, adaptive_failures = _run(adaptive, card, payments)
+    
+    for label, latencies, failures in (("fixed card", fixed_latencies, fixed_failures),
+                                       ("adaptive", adaptive_latencies, adaptive_failures)):
+        print(f"{label:<10}: p50={_percentile(latencies, 0.5) * 1000:.1f}ms "
+              f"p99={_percentile(latencies, 0.99) * 1000:.1f}ms failures={failures}")
+    print(router.report())
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_shared import ProcessObserverPool
+from behavioral.observer_stock_market import StockObserver
+
+# Runs CPU-bound observers in the producer's process and then across a pool
+# of worker processes of increasing size, publishing the same ticks each time.
+
+class StrategyBot(StockObserver):
+    def __init__(self, work=5_000):
+        self.work = work
+        self.signal = 0.0
+    
+    def update(self, stock_symbol: str, price: float, output_file=None):
+        acc = 0.0
+        for i in range(self.work):
+            acc += (price * i) % 7
+        self.signal = acc
+
+def run(observer_count=8, publish_count=50, symbol_count=500, seed=3):
+    rng = random.Random(seed)
+    symbols = [f"SYM{i:04d}" for i in range(symbol_count)]
+    ticks = [[(rng.choice(symbols), 100.0 + rng.random()) for _ in range(5)] for _ in range(publish_count)]
+    
+    observers = [StrategyBot() for _ in range(observer_count)]
+    start = time.perf_counter()
+    for batch in ticks:
+        for observer in observers:
+            for symbol, price in batch:
+                observer.update(symbol, price)
+    baseline = time.perf_counter() - start
+    print(f"in-process      : {baseline:.2f}s")
+    
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        with ProcessObserverPool(symbols, observers, workers=workers) as pool:
+            start = time.perf_counter()
+            for batch in ticks:
+                pool.wait(pool.publish(batch))
+            elapsed = time.perf_counter() - start
+        print(f"workers={workers:<2}      : {elapsed:.2f}s (speedup {baseline / elapsed:.2f}x)")
+
+if __name__ == "__main__":
+    run()
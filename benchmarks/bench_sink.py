@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_stock_market import MobileApp, TradingBot
+from behavioral.strategy_payment import CreditCardPayment, PayPalPayment
+from common.output_sink import BatchingSink, FileSink, JsonLinesSink
+
+# Drives the observer and payment paths into a file, the old way (the file
+# passed on every call, both line-buffered as when printing to a terminal and
+# normally buffered) and through sinks configured once, counting the write
+# syscalls that actually reach the OS.
+
+class CountingRaw(io.FileIO):
+    writes = 0
+    
+    def write(self, data):
+        CountingRaw.writes += 1
+        return super().write(data)
+
+def _open(path, line_buffering):
+    return io.TextIOWrapper(io.BufferedWriter(CountingRaw(path, "w")), line_buffering=line_buffering)
+
+def _workload(observers, payments, output_file, events):
+    for i in range(events):
+        price = 90.0 + i % 80
+        for observer in observers:
+            observer.update("AAPL", price, output_file)
+        payments[i % 2].process_payment(price, output_file)
+
+def run(events=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.log")
+        cases = [
+            ("per-call, line buffered", lambda: _open(path, True), False),
+            ("per-call, buffered", lambda: _open(path, False), False),
+            ("FileSink", lambda: FileSink(_open(path, False)), True),
+            ("BatchingSink(FileSink)", lambda: BatchingSink(FileSink(_open(path, False))), True),
+            ("BatchingSink(JsonLines)", lambda: BatchingSink(JsonLinesSink(FileSink(_open(path, False)))), True),
+        ]
+        for name, open_output, configured in cases:
+            CountingRaw.writes = 0
+            output = open_output()
+            sink = output if configured else None
+            observers = [MobileApp("App", sink=sink), TradingBot(sink=sink)]
+            payments = [CreditCardPayment("1234567890123456", "12/25", "123", sink=sink),
+                        PayPalPayment("user@example.com", sink=sink)]
+            start = time.perf_counter()
+            _workload(observers, payments, None if configured else output, events)
+            hot_path = time.perf_counter() - start
+            output.close()
+            total = time.perf_counter() - start
+            print(f"{name:<24}: hot path {hot_path:.2f}s, total {total:.2f}s, "
+                  f"{CountingRaw.writes:,} write syscalls")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+import os
+import resource
+import sys
+import tempfile
+import zlib
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.adapter_media import UniversalMediaPlayer
+from structural.adapter_streaming import StreamingMediaPlayer
+
+# Streams one large synthetic file per format through StreamingMediaPlayer,
+# with readinto and with mmap, and reports MB/s per format along with peak
+# RSS to show memory stays at one chunk regardless of file size.
+
+HEADERS = {
+    "song.mp3": b"ID3\x04\x00\x00\x00\x00\x00\x00",
+    "sound.wav": b"RIFF\x00\x00\x00\x00WAVEfmt ",
+    "movie.mp4": b"\x00\x00\x00\x18ftypisom",
+}
+
+class ChecksumPlayer(UniversalMediaPlayer):
+    # Touches every byte, standing in for a decoder
+    def __init__(self):
+        super().__init__()
+        self.crc = 0
+    
+    def play_chunk(self, audio_type, chunk):
+        self.crc = zlib.crc32(chunk, self.crc)
+        return len(chunk)
+
+class NullFile:
+    def write(self, text):
+        pass
+
+def _write_file(path, header, size_mb):
+    block = bytes(range(256)) * 4096
+    with open(path, "wb") as f:
+        f.write(header)
+        for _ in range(size_mb):
+            f.write(block)
+
+def run(size_mb=256):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, header in HEADERS.items():
+            path = os.path.join(tmp, name)
+            _write_file(path, header, size_mb)
+            paths.append(path)
+        
+        for use_mmap in (False, True):
+            streamer = StreamingMediaPlayer(ChecksumPlayer(), use_mmap=use_mmap)
+            for path in paths:
+                streamer.stream(path, output_file=NullFile())
+            print("mmap" if use_mmap else "readinto")
+            streamer.report()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS: {peak:.0f} MB for {size_mb} MB files")
+
+if __name__ == "__main__":
+    run()
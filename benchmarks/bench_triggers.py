@@ -0,0 +1,65 @@
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from behavioral.observer_triggers import CrossDirection, PriceTriggerEngine
+
+# Compares the bisect-indexed PriceTriggerEngine with the linear approach used
+# by TradingBot, where every rule is checked on every tick.
+
+def _noop(rule, stock_symbol, price, direction, output_file=None):
+    pass
+
+class LinearTriggerBot:
+    def __init__(self):
+        self.rules = []
+        self.last_price = None
+        self.fired = 0
+    
+    def add_rule(self, level, direction):
+        self.rules.append((level, direction))
+    
+    def update(self, stock_symbol, price, output_file=None):
+        old_price, self.last_price = self.last_price, price
+        if old_price is None:
+            return
+        for level, direction in self.rules:
+            if old_price < level <= price and direction != CrossDirection.DOWN:
+                self.fired += 1
+            elif price <= level < old_price and direction != CrossDirection.UP:
+                self.fired += 1
+
+def run(rule_count=20_000, tick_count=1_000, seed=7):
+    rng = random.Random(seed)
+    engine = PriceTriggerEngine()
+    linear = LinearTriggerBot()
+    for _ in range(rule_count):
+        level = round(rng.uniform(50, 250), 2)
+        direction = rng.choice(list(CrossDirection))
+        engine.add_rule("AAPL", level, direction, action=_noop)
+        linear.add_rule(level, direction)
+    
+    prices = [150.0]
+    for _ in range(tick_count):
+        prices.append(max(1.0, prices[-1] + rng.gauss(0, 0.5)))
+    
+    start = time.perf_counter()
+    for price in prices:
+        linear.update("AAPL", price)
+    linear_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for price in prices:
+        engine.update("AAPL", price)
+    indexed_time = time.perf_counter() - start
+    
+    assert engine.fired == linear.fired
+    print(f"rules={rule_count} ticks={len(prices)} fired={engine.fired}")
+    print(f"linear : {linear_time:.3f}s ({len(prices) / linear_time:,.0f} ticks/s)")
+    print(f"indexed: {indexed_time:.3f}s ({len(prices) / indexed_time:,.0f} ticks/s)")
+    print(f"speedup: {linear_time / indexed_time:.1f}x")
+
+if __name__ == "__main__":
+    run()
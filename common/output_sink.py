@@ -0,0 +1,207 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import collections
+import json
+import sys
+import threading
+import time
+
+# A record is (text, fields). fields is None for raw write() text and a dict
+# (possibly empty) for emit()ted messages, which get a trailing newline.
+Record = Tuple[str, Optional[Dict[str, Any]]]
+
+class OutputSink(ABC):
+    # Where pattern classes send their messages. Sinks are file-like (write,
+    # flush, close), so they can be passed anywhere an output_file is taken,
+    # and emit() writes one message as a line.
+    @abstractmethod
+    def write(self, text: str):
+        pass
+    
+    def emit(self, message: str, **fields):
+        self.write(message + "\n")
+    
+    def emit_many(self, records: Iterable[Record]):
+        for text, fields in records:
+            if fields is None:
+                self.write(text)
+            else:
+                self.emit(text, **fields)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class StdoutSink(OutputSink):
+    # Looks sys.stdout up on every write so redirection keeps working
+    def write(self, text: str):
+        sys.stdout.write(text)
+    
+    def flush(self):
+        sys.stdout.flush()
+
+class FileSink(OutputSink):
+    # Wraps an open text file, or opens path for writing when given a string.
+    # Batches handed over by emit_many become a single write call.
+    def __init__(self, file, mode: str = "w"):
+        self._owns_file = isinstance(file, str)
+        self.file = open(file, mode) if self._owns_file else file
+    
+    def write(self, text: str):
+        self.file.write(text)
+    
+    def emit_many(self, records: Iterable[Record]):
+        self.file.write("".join(text if fields is None else text + "\n" for text, fields in records))
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+class MemorySink(OutputSink):
+    def __init__(self):
+        self._chunks: List[str] = []
+    
+    def write(self, text: str):
+        self._chunks.append(text)
+    
+    def getvalue(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+    
+    @property
+    def lines(self) -> List[str]:
+        return self.getvalue().splitlines()
+
+class NullSink(OutputSink):
+    def write(self, text: str):
+        pass
+    
+    def emit(self, message: str, **fields):
+        pass
+    
+    def emit_many(self, records: Iterable[Record]):
+        pass
+
+class JsonLinesSink(OutputSink):
+    # Structured records: {"ts": ..., "message": ..., **fields} per line.
+    # Raw write() text is split into one record per line.
+    def __init__(self, target=None, clock: Callable[[], float] = time.time):
+        self.target = as_sink(target)
+        self._clock = clock
+    
+    def _format(self, message: str, fields: Dict[str, Any]) -> str:
+        record = {"ts": self._clock(), "message": message}
+        record.update(fields)
+        return json.dumps(record, default=str)
+    
+    def write(self, text: str):
+        for line in text.splitlines():
+            if line:
+                self.emit(line)
+    
+    def emit(self, message: str, **fields):
+        self.target.write(self._format(message, fields) + "\n")
+    
+    def emit_many(self, records: Iterable[Record]):
+        lines = []
+        for text, fields in records:
+            if fields is None:
+                lines.extend(self._format(line, {}) for line in text.splitlines() if line)
+            else:
+                lines.append(self._format(text, fields))
+        if lines:
+            self.target.write("\n".join(lines) + "\n")
+    
+    def flush(self):
+        self.target.flush()
+    
+    def close(self):
+        self.target.close()
+
+class BatchingSink(OutputSink):
+    # Queues records and hands them to the target sink from a background
+    # thread, in batches of up to max_batch or at least every max_delay
+    # seconds. Callers only pay for a deque append; formatting (e.g. JSON
+    # Lines) and I/O happen on the writer thread with one write per batch.
+    # Call flush() or close() to be sure everything has been written.
+    def __init__(self, target=None, max_batch: int = 1024, max_delay: float = 0.05):
+        self.target = as_sink(target)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: collections.deque = collections.deque()
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="BatchingSink", daemon=True)
+        self._thread.start()
+    
+    def write(self, text: str):
+        self._pending.append((text, None))
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+    
+    def emit(self, message: str, **fields):
+        self._pending.append((message, fields))
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+    
+    def _drain(self):
+        pending = self._pending
+        with self._drain_lock:
+            while pending:
+                batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch))]
+                self.target.emit_many(batch)
+                self.batches += 1
+    
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.max_delay)
+            self._wake.clear()
+            self._drain()
+    
+    def flush(self):
+        self._drain()
+        self.target.flush()
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self.target.close()
+
+STDOUT = StdoutSink()
+
+def as_sink(output_file=None) -> OutputSink:
+    # Sink wrappers accept any target: a sink, an open file, or None for stdout
+    if output_file is None:
+        return STDOUT
+    if isinstance(output_file, OutputSink):
+        return output_file
+    return FileSink(output_file)
+
+def emit(output_file, message: str):
+    # The one place the old "write to output_file, else print" branch lives
+    if not output_file:
+        print(message)
+    elif isinstance(output_file, OutputSink):
+        output_file.emit(message)
+    else:
+        output_file.write(message + "\n")
@@ -0,0 +1,129 @@
+from multiprocessing import shared_memory
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+import json
+import struct
+
+# Segment layout:
+#   header: magic, version, index length, values length
+#   index:  JSON object mapping key -> [offset, length] into the values area
+#   values: each value JSON-encoded on its own, back to back
+# The version doubles as a seqlock: it is odd while a writer is copying bytes
+# in, and readers retry when it moves under them.
+MAGIC = b"CFG1"
+_HEADER = struct.Struct("<4s4xQQQ")
+_MISSING = object()
+
+class SharedConfigStore:
+    # Configuration serialized once into shared memory for every process on
+    # the host. Readers only decode the key index when the version changes,
+    # and decode individual values on first access, caching them per version.
+    def __init__(self, name: Optional[str] = None, size: int = 1 << 20):
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=_HEADER.size + size)
+            _HEADER.pack_into(self._shm.buf, 0, MAGIC, 0, 2, 0)
+            self._shm.buf[_HEADER.size:_HEADER.size + 2] = b"{}"
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            if _HEADER.unpack_from(self._shm.buf, 0)[0] != MAGIC:
+                self._shm.close()
+                raise ValueError(f"Shared memory segment {name} does not hold a configuration")
+        self._version = -1
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._values_start = 0
+        self._cache: Dict[str, Any] = {}
+        self._snapshot: Optional[Mapping[str, Any]] = None
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    @property
+    def capacity(self) -> int:
+        return self._shm.size - _HEADER.size
+    
+    @property
+    def version(self) -> int:
+        return _HEADER.unpack_from(self._shm.buf, 0)[1] // 2
+    
+    def publish(self, config: Mapping[str, Any]) -> int:
+        # Single writer per segment: two concurrent publishers would corrupt
+        # the seqlock. ConfigurationManager only writes from the attachment
+        # made with publish=True; other attachments are read-only.
+        index: Dict[str, Tuple[int, int]] = {}
+        encoded = []
+        offset = 0
+        for key, value in config.items():
+            data = json.dumps(value).encode()
+            index[key] = (offset, len(data))
+            encoded.append(data)
+            offset += len(data)
+        index_bytes = json.dumps(index).encode()
+        values_bytes = b"".join(encoded)
+        if len(index_bytes) + len(values_bytes) > self.capacity:
+            raise ValueError(f"Configuration needs {len(index_bytes) + len(values_bytes)} bytes, "
+                             f"segment holds {self.capacity}")
+        
+        buf = self._shm.buf
+        _, version, _, _ = _HEADER.unpack_from(buf, 0)
+        _HEADER.pack_into(buf, 0, MAGIC, version + 1, 0, 0)
+        start = _HEADER.size
+        buf[start:start + len(index_bytes)] = index_bytes
+        start += len(index_bytes)
+        buf[start:start + len(values_bytes)] = values_bytes
+        _HEADER.pack_into(buf, 0, MAGIC, version + 2, len(index_bytes), len(values_bytes))
+        return (version + 2) // 2
+    
+    def _refresh(self) -> int:
+        buf = self._shm.buf
+        while True:
+            _, version, index_length, _ = _HEADER.unpack_from(buf, 0)
+            if version == self._version:
+                return version
+            if version & 1:
+                continue
+            index_bytes = bytes(buf[_HEADER.size:_HEADER.size + index_length])
+            if _HEADER.unpack_from(buf, 0)[1] != version:
+                continue
+            self._index = {key: tuple(entry) for key, entry in json.loads(index_bytes).items()}
+            self._values_start = _HEADER.size + index_length
+            self._cache = {}
+            self._snapshot = None
+            self._version = version
+            return version
+    
+    def get(self, key: str, default=None):
+        while True:
+            version = self._refresh()
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            entry = self._index.get(key)
+            if entry is None:
+                return default
+            offset, length = entry
+            start = self._values_start + offset
+            data = bytes(self._shm.buf[start:start + length])
+            if _HEADER.unpack_from(self._shm.buf, 0)[1] != version:
+                continue
+            value = self._cache[key] = json.loads(data)
+            return value
+    
+    def snapshot(self) -> Mapping[str, Any]:
+        while True:
+            version = self._refresh()
+            if self._snapshot is not None:
+                return self._snapshot
+            snapshot = MappingProxyType({key: self.get(key) for key in list(self._index)})
+            # Retry if a new version landed while decoding
+            if self._version == version:
+                self._snapshot = snapshot
+                return snapshot
+    
+    def close(self, unlink: Optional[bool] = None):
+        self._cache = {}
+        self._snapshot = None
+        self._shm.close()
+        if self._owner if unlink is None else unlink:
+            self._shm.unlink()
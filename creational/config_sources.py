@@ -0,0 +1,107 @@
+from typing import Any, Dict, Mapping, Optional, Tuple
+import configparser
+import hashlib
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+def flatten(values: Mapping[str, Any], prefix: str = "") -> Dict[str, Any]:
+    # Nested tables become dotted keys: {"db": {"url": x}} -> {"db.url": x}
+    flat: Dict[str, Any] = {}
+    for key, value in values.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            flat.update(flatten(value, full_key + "."))
+        else:
+            flat[full_key] = value
+    return flat
+
+def _parse_json(text: str) -> Dict[str, Any]:
+    return flatten(json.loads(text) if text.strip() else {})
+
+def _parse_toml(text: str) -> Dict[str, Any]:
+    if tomllib is None:
+        raise RuntimeError("TOML configuration files need Python 3.11 or newer")
+    return flatten(tomllib.loads(text))
+
+def _parse_ini(text: str) -> Dict[str, Any]:
+    parser = configparser.ConfigParser()
+    parser.read_string(text)
+    values = {key: parse_scalar(value) for key, value in parser.defaults().items()}
+    for section in parser.sections():
+        for key, value in parser.items(section, raw=True):
+            if key not in parser.defaults():
+                values[f"{section}.{key}"] = parse_scalar(value)
+    return values
+
+PARSERS = {
+    ".json": _parse_json,
+    ".toml": _parse_toml,
+    ".ini": _parse_ini,
+    ".cfg": _parse_ini,
+}
+
+def parse_scalar(text: str) -> Any:
+    # "60" -> 60, "true" -> True, "[1, 2]" -> [1, 2]; anything else stays text
+    lowered = text.strip().lower()
+    if lowered in ("true", "yes", "on"):
+        return True
+    if lowered in ("false", "no", "off"):
+        return False
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+class ConfigFile:
+    # One configuration layer. The parsed values are cached and only rebuilt
+    # when the file's mtime/size change *and* its content hash differs, so
+    # touching a file or polling it is cheap. A missing file is an empty layer.
+    def __init__(self, path: str):
+        self.path = path
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in PARSERS:
+            raise ValueError(f"Unsupported configuration format: {path}")
+        self._parse = PARSERS[extension]
+        self._stat: Optional[Tuple[int, int]] = None
+        self._digest: Optional[bytes] = None
+        self._values: Dict[str, Any] = {}
+    
+    def load(self) -> Tuple[Dict[str, Any], bool]:
+        # Returns (values, changed since the previous load)
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            changed = self._digest is not None
+            self._stat = self._digest = None
+            self._values = {}
+            return self._values, changed
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._stat:
+            return self._values, False
+        with open(self.path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).digest()
+        if digest == self._digest:
+            self._stat = signature
+            return self._values, False
+        # The signature is only recorded with the values parsed for it, so a
+        # parse error leaves the old layer in place and the next load retries
+        values = self._parse(content.decode("utf-8"))
+        self._values, self._digest, self._stat = values, digest, signature
+        return values, True
+
+def environment_overrides(prefix: Optional[str], environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    # APP_TIMEOUT=60 -> {"timeout": 60}; APP_DB__URL=x -> {"db.url": "x"}
+    if not prefix:
+        return {}
+    environ = os.environ if environ is None else environ
+    return {
+        name[len(prefix):].lower().replace("__", "."): parse_scalar(value)
+        for name, value in environ.items()
+        if name.startswith(prefix) and len(name) > len(prefix)
+    }
@@ -0,0 +1,140 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Type
+import csv
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.factory_vehicles import Vehicle, VehicleFactory, VehicleKey, _registry_key
+
+class Fleet:
+    # Column-wise vehicle storage: one type code and one interned model id per
+    # vehicle, kept in compact arrays. Indexing hands out VehicleView
+    # flyweights instead of full vehicle objects.
+    def __init__(self):
+        self._type_codes = array("H")
+        self._model_ids = array("I")
+        self._types: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._classes: List[Type[Vehicle]] = []
+        self._models: List[str] = []
+        self._model_index: Dict[str, int] = {}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[VehicleKey, str]]) -> "Fleet":
+        fleet = cls()
+        fleet.extend(rows)
+        return fleet
+    
+    @classmethod
+    def from_csv(cls, stream: TextIO, header: bool = False) -> "Fleet":
+        # Rows are "type,model", e.g. "car,Toyota Camry"
+        reader = csv.reader(stream)
+        if header:
+            next(reader, None)
+        return cls.from_rows((row[0].strip(), row[1].strip()) for row in reader if row)
+    
+    def _type_id(self, vehicle_type: VehicleKey) -> int:
+        key = _registry_key(vehicle_type)
+        type_id = self._type_ids.get(key)
+        if type_id is None:
+            # Resolving through the factory validates the type and loads plugins
+            vehicle_class = VehicleFactory.vehicle_class(vehicle_type)
+            type_id = self._type_ids[key] = len(self._types)
+            self._types.append(key)
+            self._classes.append(vehicle_class)
+        return type_id
+    
+    def _model_id(self, model: str) -> int:
+        model_id = self._model_index.get(model)
+        if model_id is None:
+            model_id = self._model_index[model] = len(self._models)
+            self._models.append(model)
+        return model_id
+    
+    def add(self, vehicle_type: VehicleKey, model: str) -> int:
+        self._type_codes.append(self._type_id(vehicle_type))
+        self._model_ids.append(self._model_id(model))
+        return len(self._type_codes) - 1
+    
+    def extend(self, rows: Iterable[Tuple[VehicleKey, str]]):
+        type_ids = self._type_ids
+        model_index = self._model_index
+        type_codes = self._type_codes
+        model_ids = self._model_ids
+        for vehicle_type, model in rows:
+            key = vehicle_type if vehicle_type.__class__ is str else _registry_key(vehicle_type)
+            type_id = type_ids.get(key)
+            if type_id is None:
+                type_id = self._type_id(vehicle_type)
+            model_id = model_index.get(model)
+            if model_id is None:
+                model_id = self._model_id(model)
+            type_codes.append(type_id)
+            model_ids.append(model_id)
+    
+    def __len__(self) -> int:
+        return len(self._type_codes)
+    
+    def __getitem__(self, index: int) -> "VehicleView":
+        if index < 0:
+            index += len(self._type_codes)
+        if not 0 <= index < len(self._type_codes):
+            raise IndexError("fleet index out of range")
+        return VehicleView(self, index)
+    
+    def __iter__(self) -> Iterator["VehicleView"]:
+        for index in range(len(self._type_codes)):
+            yield VehicleView(self, index)
+    
+    def vehicle_type(self, index: int) -> str:
+        return self._types[self._type_codes[index]]
+    
+    def model(self, index: int) -> str:
+        return self._models[self._model_ids[index]]
+    
+    def materialize(self, index: int) -> Vehicle:
+        # Full vehicle object, for classes whose behaviour needs more than a model
+        return self._classes[self._type_codes[index]](self.model(index))
+    
+    def count_by_type(self) -> Dict[str, int]:
+        counts = [0] * len(self._types)
+        for type_id in self._type_codes:
+            counts[type_id] += 1
+        return {self._types[type_id]: count for type_id, count in enumerate(counts)}
+
+class VehicleView(Vehicle):
+    # Flyweight over one fleet row. Engine methods and __str__ borrow the
+    # registered class's implementation, which only reads self.model.
+    __slots__ = ("_fleet", "_index")
+    
+    def __init__(self, fleet: Fleet, index: int):
+        self._fleet = fleet
+        self._index = index
+    
+    @property
+    def model(self) -> str:
+        return self._fleet.model(self._index)
+    
+    @property
+    def vehicle_class(self) -> Type[Vehicle]:
+        fleet = self._fleet
+        return fleet._classes[fleet._type_codes[self._index]]
+    
+    def start_engine(self, output_file=None):
+        return self.vehicle_class.start_engine(self, output_file)
+    
+    def stop_engine(self, output_file=None):
+        return self.vehicle_class.stop_engine(self, output_file)
+    
+    def __str__(self):
+        return self.vehicle_class.__str__(self)
+    
+    def __eq__(self, other):
+        return isinstance(other, VehicleView) and other._fleet is self._fleet and other._index == self._index
+    
+    def __hash__(self):
+        return hash((id(self._fleet), self._index))
+
+def create_many(rows: Iterable[Tuple[VehicleKey, str]]) -> Fleet:
+    return Fleet.from_rows(rows)
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.factory_vehicles import Vehicle, VehicleFactory, VehicleKey, _registry_key
+
+class VehiclePool:
+    # Recycles released vehicles per type instead of allocating new ones.
+    # acquire() resets a pooled vehicle through Vehicle.reset(model); at most
+    # max_size idle vehicles are kept per type, extras are left to the GC.
+    def __init__(self, max_size: int = 64, factory=VehicleFactory):
+        self.max_size = max_size
+        self._factory = factory
+        self._free: Dict[str, List[Vehicle]] = {}
+        # id -> type key of every vehicle handed out and not yet released
+        self._checked_out: Dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+        self.discarded = 0
+    
+    def acquire(self, vehicle_type: VehicleKey, model: str) -> Vehicle:
+        key = _registry_key(vehicle_type)
+        free = self._free.get(key)
+        if free:
+            vehicle = free.pop()
+            vehicle.reset(model)
+            self.hits += 1
+        else:
+            vehicle = self._factory.create_vehicle(vehicle_type, model)
+            self.misses += 1
+        self._checked_out[id(vehicle)] = key
+        return vehicle
+    
+    def release(self, vehicle: Vehicle):
+        key = self._checked_out.pop(id(vehicle), None)
+        if key is None:
+            # Not from this pool, or released twice
+            self.discarded += 1
+            return
+        self.releases += 1
+        free = self._free.get(key)
+        if free is None:
+            free = self._free[key] = []
+        if len(free) < self.max_size:
+            free.append(vehicle)
+        else:
+            self.discarded += 1
+    
+    @contextmanager
+    def vehicle(self, vehicle_type: VehicleKey, model: str) -> Iterator[Vehicle]:
+        vehicle = self.acquire(vehicle_type, model)
+        try:
+            yield vehicle
+        finally:
+            self.release(vehicle)
+    
+    def size(self, vehicle_type: Optional[VehicleKey] = None) -> int:
+        if vehicle_type is None:
+            return sum(len(free) for free in self._free.values())
+        return len(self._free.get(_registry_key(vehicle_type), ()))
+    
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+    
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "releases": self.releases,
+            "discarded": self.discarded,
+            "size": self.size(),
+        }
+
+class ThreadSafeVehiclePool(VehiclePool):
+    def __init__(self, max_size: int = 64, factory=VehicleFactory):
+        super().__init__(max_size, factory)
+        self._lock = threading.Lock()
+    
+    def acquire(self, vehicle_type: VehicleKey, model: str) -> Vehicle:
+        with self._lock:
+            return super().acquire(vehicle_type, model)
+    
+    def release(self, vehicle: Vehicle):
+        with self._lock:
+            super().release(vehicle)
@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from typing import Callable, Dict, Type, Union
+import importlib
 import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
 
 class VehicleType(Enum):
     CAR = "car"
@@ -8,6 +15,12 @@ class VehicleType(Enum):
     TRUCK = "truck"
 
 class Vehicle(ABC):
+    # Empty slots keep subclasses free to be __dict__-less (see factory_fleet)
+    __slots__ = ()
+    # Where engine messages go when no output_file is passed; concrete
+    # vehicles accept it once at construction
+    sink = None
+    
     @abstractmethod
     def start_engine(self, output_file=None):
         pass
@@ -15,81 +28,165 @@ class Vehicle(ABC):
     @abstractmethod
     def stop_engine(self, output_file=None):
         pass
+    
+    def reset(self, model: str):
+        # Called by VehiclePool before a recycled vehicle is handed out again
+        self.model = model
 
 class Car(Vehicle):
-    def __init__(self, model: str):
+    def __init__(self, model: str, sink=None):
         self.model = model
+        self.sink = sink
     
     def start_engine(self, output_file=None):
         message = f"Car {self.model}: Engine started quietly"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def stop_engine(self, output_file=None):
         message = f"Car {self.model}: Engine stopped"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def __str__(self):
         return f"Car: {self.model}"
 
 class Motorcycle(Vehicle):
-    def __init__(self, model: str):
+    def __init__(self, model: str, sink=None):
         self.model = model
+        self.sink = sink
     
     def start_engine(self, output_file=None):
         message = f"Motorcycle {self.model}: Engine ROARS to life!"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def stop_engine(self, output_file=None):
         message = f"Motorcycle {self.model}: Engine shut down"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def __str__(self):
         return f"Motorcycle: {self.model}"
 
 class Truck(Vehicle):
-    def __init__(self, model: str):
+    def __init__(self, model: str, sink=None):
         self.model = model
+        self.sink = sink
     
     def start_engine(self, output_file=None):
         message = f"Truck {self.model}: Diesel engine rumbles powerfully"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def stop_engine(self, output_file=None):
         message = f"Truck {self.model}: Heavy engine stopped"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file or self.sink, message)
     
     def __str__(self):
         return f"Truck: {self.model}"
 
+# Entry point group third-party packages can use to provide vehicle types,
+# e.g. "bus = fleet_plugins.bus:Bus" makes create_vehicle("bus", ...) work.
+ENTRY_POINT_GROUP = "designpatterns.vehicles"
+
+VehicleKey = Union[VehicleType, str]
+
+def _registry_key(vehicle_type: VehicleKey) -> str:
+    return vehicle_type.value if isinstance(vehicle_type, VehicleType) else vehicle_type
+
 class VehicleFactory:
-    @staticmethod
-    def create_vehicle(vehicle_type: VehicleType, model: str) -> Vehicle:
-        if vehicle_type == VehicleType.CAR:
-            return Car(model)
-        elif vehicle_type == VehicleType.MOTORCYCLE:
-            return Motorcycle(model)
-        elif vehicle_type == VehicleType.TRUCK:
-            return Truck(model)
+    # Vehicle classes are looked up by type key in a dict. Plugins registered
+    # as "module:ClassName" strings, or found through entry points, are only
+    # imported the first time their type is requested.
+    _registry: Dict[str, Type[Vehicle]] = {}
+    _lazy: Dict[str, str] = {}
+    _entry_points_loaded = False
+    # Serializes plugin imports; reentrant so a plugin module may register
+    # or create vehicles while it is being imported
+    _resolve_lock = threading.RLock()
+    
+    @classmethod
+    def register(cls, vehicle_type: VehicleKey, vehicle_class: Union[Type[Vehicle], str, None] = None):
+        key = _registry_key(vehicle_type)
+        if vehicle_class is None:
+            # Decorator form: @VehicleFactory.register("bus")
+            def decorator(klass: Type[Vehicle]) -> Type[Vehicle]:
+                cls._registry[key] = klass
+                cls._lazy.pop(key, None)
+                return klass
+            return decorator
+        if isinstance(vehicle_class, str):
+            cls._registry.pop(key, None)
+            cls._lazy[key] = vehicle_class
         else:
+            cls._registry[key] = vehicle_class
+            cls._lazy.pop(key, None)
+        return vehicle_class
+    
+    @classmethod
+    def unregister(cls, vehicle_type: VehicleKey):
+        key = _registry_key(vehicle_type)
+        cls._registry.pop(key, None)
+        cls._lazy.pop(key, None)
+    
+    @classmethod
+    def registered_types(cls):
+        cls._load_entry_points()
+        return sorted(set(cls._registry) | set(cls._lazy))
+    
+    @classmethod
+    def create_vehicle(cls, vehicle_type: VehicleKey, model: str, sink=None) -> Vehicle:
+        try:
+            vehicle_class = cls._registry[_registry_key(vehicle_type)]
+        except (KeyError, TypeError):
+            vehicle_class = cls._resolve(vehicle_type)
+        if sink is None:
+            return vehicle_class(model)
+        return vehicle_class(model, sink=sink)
+    
+    @classmethod
+    def vehicle_class(cls, vehicle_type: VehicleKey) -> Type[Vehicle]:
+        vehicle_class = cls._registry.get(_registry_key(vehicle_type))
+        return vehicle_class if vehicle_class is not None else cls._resolve(vehicle_type)
+    
+    @classmethod
+    def _resolve(cls, vehicle_type) -> Type[Vehicle]:
+        # Slow path: unhashable or unknown keys, lazy plugins and entry points
+        if not isinstance(vehicle_type, (VehicleType, str)):
             raise ValueError(f"Unknown vehicle type: {vehicle_type}")
+        key = _registry_key(vehicle_type)
+        with cls._resolve_lock:
+            if key in cls._registry:
+                return cls._registry[key]
+            if key not in cls._lazy:
+                cls._load_entry_points()
+            spec = cls._lazy.get(key)
+            if spec is None:
+                raise ValueError(f"Unknown vehicle type: {vehicle_type}")
+            # The spec is only dropped once the import succeeded, so a failed
+            # import is retried and keeps raising its real error
+            module_name, _, class_name = spec.partition(":")
+            vehicle_class = getattr(importlib.import_module(module_name), class_name)
+            cls._registry[key] = vehicle_class
+            cls._lazy.pop(key, None)
+            return vehicle_class
+    
+    @classmethod
+    def _load_entry_points(cls):
+        if cls._entry_points_loaded:
+            return
+        cls._entry_points_loaded = True
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception:
+            return
+        for entry_point in found:
+            if entry_point.name not in cls._registry:
+                cls._lazy.setdefault(entry_point.name, entry_point.value)
+
+def register_vehicle(vehicle_type: VehicleKey) -> Callable[[Type[Vehicle]], Type[Vehicle]]:
+    return VehicleFactory.register(vehicle_type)
+
+VehicleFactory.register(VehicleType.CAR, Car)
+VehicleFactory.register(VehicleType.MOTORCYCLE, Motorcycle)
+VehicleFactory.register(VehicleType.TRUCK, Truck)
 
 def demo_factory(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
@@ -1,36 +1,281 @@
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from creational.config_sources import ConfigFile, environment_overrides
+
+if TYPE_CHECKING:
+    # Only needed for annotations; keeps multiprocessing out of plain imports
+    from creational.config_shared import SharedConfigStore
+
+DEFAULT_CONFIG = {
+    "database_url": "localhost:5432/mydb",
+    "api_key": "default_api_key_123",
+    "max_connections": 100,
+    "debug_mode": False,
+    "timeout": 30
+}
+
+# Subscribers receive {key: (old_value, new_value)} for the keys that changed
+ChangeCallback = Callable[[Dict[str, Tuple[Any, Any]]], None]
 
 class ConfigurationManager:
     _instance = None
+    _instance_lock = threading.Lock()
     
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ConfigurationManager, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
+        instance = cls._instance
+        if instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(ConfigurationManager, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+                instance = cls._instance
+        return instance
     
     def _initialize(self):
-        self._config = {
-            "database_url": "localhost:5432/mydb",
-            "api_key": "default_api_key_123",
-            "max_connections": 100,
-            "debug_mode": False,
-            "timeout": 30
-        }
+        # The configuration is an immutable snapshot paired with its version.
+        # Readers fetch self._state without locking or copying; writers build a
+        # new dict under the write lock and swap the whole tuple in at once.
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._state = (0, MappingProxyType(dict(DEFAULT_CONFIG)))
+        # Layers, lowest first: defaults, files, environment, then set() calls
+        self._files: List[ConfigFile] = []
+        self._env_prefix: Optional[str] = None
+        self._env: Dict[str, Any] = {}
+        self._overrides: Dict[str, Any] = {}
+        self._needs_load = False
+        self._shared: Optional["SharedConfigStore"] = None
+        self._shared_writable = False
+        # Added to the store's version so ours never goes backwards on attach
+        self._version_offset = 0
+        # Set while a lazy load is pending or a shared store is attached, so
+        # plain get() calls only pay for a single flag check
+        self._slow_path = False
+        self._subscribers: List[Tuple[ChangeCallback, Optional[frozenset]]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+    
+    def _check_writable(self):
+        if self._shared is not None and not self._shared_writable:
+            raise RuntimeError("Configuration is attached read-only to shared memory; "
+                               "change it in the process that publishes the store")
+    
+    def _publish(self, config: dict):
+        self._check_writable()
+        old = self._current()[1] if self._shared is not None else self._state[1]
+        if self._shared is not None:
+            self._shared.publish(config)
+        else:
+            self._state = (self._state[0] + 1, MappingProxyType(config))
+        self._notify(old, self._current()[1])
+    
+    def _current(self) -> Tuple[int, Mapping[str, Any]]:
+        if self._needs_load:
+            self.reload()
+        if self._shared is not None:
+            return self._shared.version + self._version_offset, self._shared.snapshot()
+        return self._state
+    
+    @property
+    def version(self) -> int:
+        return self._current()[0]
+    
+    def snapshot(self) -> Mapping[str, Any]:
+        return self._current()[1]
     
     def get(self, key: str):
-        return self._config.get(key)
+        if self._slow_path:
+            if self._needs_load:
+                self.reload()
+            if self._shared is not None:
+                return self._shared.get(key)
+        return self._state[1].get(key)
     
     def set(self, key: str, value):
-        self._config[key] = value
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending[key] = value
+            self._local.pending_keys.add(key)
+            return
+        with self._write_lock:
+            config = dict(self._current()[1])
+            config[key] = value
+            self._publish(config)
+            self._overrides[key] = value
+    
+    def update(self, values: Mapping[str, Any]):
+        with self.transaction():
+            for key, value in values.items():
+                self.set(key, value)
+    
+    @contextmanager
+    def transaction(self):
+        # Batches set() calls from this thread into a single new version.
+        # Readers keep seeing the previous snapshot until the block exits.
+        with self._write_lock:
+            if getattr(self._local, "pending", None) is not None:
+                yield self
+                return
+            self._local.pending = dict(self._current()[1])
+            self._local.pending_keys = set()
+            try:
+                yield self
+                pending = self._local.pending
+                self._publish(pending)
+                for key in self._local.pending_keys:
+                    self._overrides[key] = pending[key]
+            finally:
+                self._local.pending = None
+                self._local.pending_keys = None
+    
+    def get_all_config(self) -> Mapping[str, Any]:
+        # Read-only view of the current snapshot; no copy is made
+        return self._current()[1]
     
-    def get_all_config(self):
-        return self._config.copy()
+    def load_files(self, *paths: str, env_prefix: Optional[str] = None):
+        # Layers JSON/TOML/INI files (later files win) and environment
+        # variables starting with env_prefix over the defaults. Files are
+        # parsed lazily, on the first read after this call.
+        with self._write_lock:
+            self._files = [ConfigFile(path) for path in paths]
+            self._env_prefix = env_prefix
+            self._env = {}
+            self._needs_load = True
+            self._slow_path = True
+    
+    def reload(self, force: bool = False) -> Dict[str, Tuple[Any, Any]]:
+        # Re-reads the layers and publishes a new version if anything changed.
+        # Runs under the write lock so concurrent first reads and the watcher
+        # parse the files once and never publish stale layers; readers of an
+        # already loaded configuration never take the lock.
+        with self._write_lock:
+            layers = []
+            changed = force or self._needs_load
+            for config_file in list(self._files):
+                values, file_changed = config_file.load()
+                layers.append(values)
+                changed = changed or file_changed
+            env = environment_overrides(self._env_prefix)
+            changed = changed or env != self._env
+            if not changed:
+                return {}
+            
+            self._needs_load = False
+            self._slow_path = self._shared is not None
+            self._env = env
+            if self._shared is not None and not self._shared_writable:
+                # Read-only attachment: the publishing process owns the values
+                return {}
+            config = dict(DEFAULT_CONFIG)
+            for values in layers:
+                config.update(values)
+            config.update(env)
+            config.update(self._overrides)
+            diff = _diff(self._current()[1], config)
+            if diff:
+                self._publish(config)
+            return diff
+    
+    def use_shared_memory(self, store: "SharedConfigStore", publish: bool = False):
+        # Serves reads from a SharedConfigStore shared by every process on the
+        # host. The one process that publishes the store passes publish=True:
+        # it seeds the store with its configuration, and its set() and
+        # reload() write to it. Every other attachment is read-only and its
+        # set() raises, since the store's seqlock allows a single writer.
+        # Values travel as JSON, so e.g. a tuple set() here reads back as a
+        # list and non-JSON values are rejected.
+        with self._write_lock:
+            version, config = self._current()
+            config = dict(config)
+            self._shared = store
+            self._shared_writable = publish
+            self._slow_path = True
+            if publish:
+                self._shared.publish(config)
+            self._version_offset = max(0, version + 1 - store.version)
+    
+    def detach_shared_memory(self):
+        # Keeps the last shared configuration as this process's local copy
+        with self._write_lock:
+            if self._shared is None:
+                return
+            version = max(self._state[0], self._shared.version + self._version_offset) + 1
+            config = dict(self._shared.snapshot())
+            self._shared = None
+            self._shared_writable = False
+            self._version_offset = 0
+            self._slow_path = self._needs_load
+            self._state = (version, MappingProxyType(config))
+    
+    def subscribe(self, callback: ChangeCallback, keys: Optional[Iterable[str]] = None) -> ChangeCallback:
+        # callback is only invoked when one of keys (default: any key) changes
+        self._subscribers.append((callback, frozenset(keys) if keys is not None else None))
+        return callback
+    
+    def unsubscribe(self, callback: ChangeCallback):
+        self._subscribers = [entry for entry in self._subscribers if entry[0] is not callback]
+    
+    def _notify(self, old: Mapping[str, Any], new: Mapping[str, Any]):
+        if not self._subscribers:
+            return
+        diff = _diff(old, new)
+        if not diff:
+            return
+        for callback, keys in list(self._subscribers):
+            if keys is None:
+                callback(diff)
+            else:
+                relevant = {key: change for key, change in diff.items() if key in keys}
+                if relevant:
+                    callback(relevant)
+    
+    def start_watching(self, interval: float = 1.0):
+        # Polls the files' mtime/size every interval seconds in a daemon thread
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    # Keep serving the last good configuration
+                    pass
+        
+        self._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
     
     def __str__(self):
-        config_str = "\n".join([f"{k}: {v}" for k, v in self._config.items()])
+        config_str = "\n".join([f"{k}: {v}" for k, v in self._current()[1].items()])
         return f"Configuration:\n{config_str}"
 
+_MISSING = object()
+
+def _diff(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    changes = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if previous is _MISSING or previous != value:
+            changes[key] = (None if previous is _MISSING else previous, value)
+    for key, value in old.items():
+        if key not in new:
+            changes[key] = (value, None)
+    return changes
+
 def demo_singleton(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
     
@@ -41,10 +286,11 @@ def demo_singleton(results_dir="results"):
         config1 = ConfigurationManager()
         f.write("Config 1 - Database URL: " + str(config1.get("database_url")) + "\n")
         
-        # Modify via first instance
-        config1.set("api_key", "new_secret_key_456")
-        config1.set("debug_mode", True)
-        config1.set("timeout", 60)
+        # Modify via first instance, publishing all changes as one version
+        with config1.transaction():
+            config1.set("api_key", "new_secret_key_456")
+            config1.set("debug_mode", True)
+            config1.set("timeout", 60)
         
         # Second instance - should have same modified data
         config2 = ConfigurationManager()
@@ -1,37 +1,113 @@
-from behavioral.observer_stock_market import demo_observer
-from behavioral.strategy_payment import demo_strategy
-from creational.factory_vehicles import demo_factory
-from creational.singleton_config import demo_singleton
-from structural.adapter_media import demo_adapter
-from structural.decorator_coffee import demo_decorator
-import os
+import argparse
 import datetime
+import fnmatch
+import importlib
+import os
+import time
+
+# name -> (module, demo function, category). Modules are only imported when
+# their demo is selected, so startup doesn't pay for patterns that won't run.
+DEMOS = {
+    "observer": ("behavioral.observer_stock_market", "demo_observer", "Behavioral"),
+    "strategy": ("behavioral.strategy_payment", "demo_strategy", "Behavioral"),
+    "factory": ("creational.factory_vehicles", "demo_factory", "Creational"),
+    "singleton": ("creational.singleton_config", "demo_singleton", "Creational"),
+    "adapter": ("structural.adapter_media", "demo_adapter", "Structural"),
+    "decorator": ("structural.decorator_coffee", "demo_decorator", "Structural"),
+}
+
+CATEGORY_BANNERS = {
+    "Behavioral": "📊 Running Behavioral Patterns...",
+    "Creational": "🏭 Running Creational Patterns...",
+    "Structural": "🏗️  Running Structural Patterns...",
+}
+
+def select_demos(patterns=None):
+    # Shell-style patterns against demo names or categories, e.g. "obs*" or
+    # "structural"; no patterns selects everything, in registry order
+    if not patterns:
+        return list(DEMOS)
+    selected = []
+    for name, (_, _, category) in DEMOS.items():
+        if any(fnmatch.fnmatch(name, pattern.lower()) or fnmatch.fnmatch(category.lower(), pattern.lower())
+               for pattern in patterns):
+            selected.append(name)
+    return selected
+
+def run_demo(name, results_dir):
+    module_name, function_name, _ = DEMOS[name]
+    start = time.perf_counter()
+    demo = getattr(importlib.import_module(module_name), function_name)
+    demo(results_dir)
+    return name, time.perf_counter() - start
 
-def main():
-    results_dir = "results"
+def run_demos(names, results_dir="results", jobs=1, threads=False):
+    # Each demo writes its own file, so they can run side by side. Returns
+    # {name: wall seconds} in the order the demos finished.
+    os.makedirs(results_dir, exist_ok=True)
+    timings = {}
+    if jobs == 1 or len(names) <= 1:
+        category = None
+        for name in names:
+            if DEMOS[name][2] != category:
+                category = DEMOS[name][2]
+                print(CATEGORY_BANNERS[category])
+            name, seconds = run_demo(name, results_dir)
+            timings[name] = seconds
+            print(f"   ✓ {name} ({seconds:.2f}s)")
+        return timings
     
-    print("🚀 Design Patterns Demonstration")
-    print(f"📁 Output will be saved to: {results_dir}/\n")
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    executor_class = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    workers = min(jobs or os.cpu_count() or 1, len(names))
+    print(f"⚙️  Running {len(names)} demos on {workers} {'threads' if threads else 'processes'}...")
+    with executor_class(max_workers=workers) as executor:
+        futures = [executor.submit(run_demo, name, results_dir) for name in names]
+        for future in as_completed(futures):
+            name, seconds = future.result()
+            timings[name] = seconds
+            print(f"   ✓ {name} ({seconds:.2f}s)")
+    return timings
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the design pattern demonstrations.")
+    parser.add_argument("patterns", nargs="*",
+                        help="demo names or categories to run (shell-style patterns); default: all")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of demos to run at once; 0 uses every CPU (default: 1)")
+    parser.add_argument("--threads", action="store_true",
+                        help="run demos on a thread pool instead of worker processes")
+    parser.add_argument("--results-dir", default="results", help="where demo output is written")
+    parser.add_argument("--list", action="store_true", help="list the available demos and exit")
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for name, (module_name, _, category) in DEMOS.items():
+            print(f"{name:<10} {category:<11} {module_name}")
+        return
     
-    # Behavioral Patterns
-    print("📊 Running Behavioral Patterns...")
-    demo_observer(results_dir)
-    demo_strategy(results_dir)
+    names = select_demos(args.patterns)
+    if not names:
+        raise SystemExit(f"No demos match {' '.join(args.patterns)}; use --list to see them")
+    results_dir = args.results_dir
     
-    # Creational Patterns
-    print("🏭 Running Creational Patterns...")
-    demo_factory(results_dir)
-    demo_singleton(results_dir)
+    print("🚀 Design Patterns Demonstration")
+    print(f"📁 Output will be saved to: {results_dir}/\n")
     
-    # Structural Patterns
-    print("🏗️  Running Structural Patterns...")
-    demo_adapter(results_dir)
-    demo_decorator(results_dir)
+    start = time.perf_counter()
+    timings = run_demos(names, results_dir, args.jobs, args.threads)
+    elapsed = time.perf_counter() - start
     
     # Create a summary file
     create_summary(results_dir)
     
     print(f"\n🎉 All design patterns demonstrated successfully!")
+    print(f"⏱️  {len(timings)} demos in {elapsed:.2f}s (sum of demo times {sum(timings.values()):.2f}s)")
     print(f"📂 Results saved in: {results_dir}/")
     print("📄 Files created:")
     for file in os.listdir(results_dir):
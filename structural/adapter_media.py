@@ -1,101 +1,224 @@
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional
 import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
 
 # Target Interface
 class MediaPlayer(ABC):
+    # Where messages go when play() is not given an output_file
+    sink = None
+    
     @abstractmethod
     def play(self, audio_type: str, filename: str, output_file=None):
         pass
+    
+    def play_chunk(self, audio_type: str, chunk: memoryview) -> int:
+        # Streaming hook: chunk is a view into the reader's reusable buffer and
+        # is only valid for the duration of the call. Returns bytes consumed;
+        # players that cannot stream consume nothing.
+        return 0
 
 # Adaptee 1 - Advanced Media Player
 class AdvancedMediaPlayer:
+    def __init__(self):
+        self.bytes_decoded: Dict[str, int] = {}
+    
+    def _decode(self, audio_type: str, chunk: memoryview) -> int:
+        self.bytes_decoded[audio_type] = self.bytes_decoded.get(audio_type, 0) + len(chunk)
+        return len(chunk)
+    
+    def decode_vlc(self, chunk: memoryview) -> int:
+        return self._decode("vlc", chunk)
+    
+    def decode_mp4(self, chunk: memoryview) -> int:
+        return self._decode("mp4", chunk)
+    
     def play_vlc(self, filename: str, output_file=None):
         message = f"Playing VLC file: {filename}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file, message)
     
     def play_mp4(self, filename: str, output_file=None):
         message = f"Playing MP4 file: {filename}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file, message)
 
 # Adaptee 2 - Legacy Audio Player
 class LegacyAudioPlayer:
+    def __init__(self):
+        self.bytes_decoded: Dict[str, int] = {}
+    
+    def _decode(self, audio_type: str, chunk: memoryview) -> int:
+        self.bytes_decoded[audio_type] = self.bytes_decoded.get(audio_type, 0) + len(chunk)
+        return len(chunk)
+    
+    def decode_mp3(self, chunk: memoryview) -> int:
+        return self._decode("mp3", chunk)
+    
+    def decode_wav(self, chunk: memoryview) -> int:
+        return self._decode("wav", chunk)
+    
     def play_mp3(self, filename: str, output_file=None):
         message = f"Playing MP3 file: {filename}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file, message)
     
     def play_wav(self, filename: str, output_file=None):
         message = f"Playing WAV file: {filename}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file, message)
+
+# Registry mapping normalized format keys, MIME types and file extensions to
+# the callable that plays them, and optionally to the one that consumes
+# streamed chunks. Lookups of raw caller strings are memoized, so dispatch is
+# a single dict hit however many formats are registered.
+FormatHandler = Callable[[str, Optional[object]], None]
+ChunkHandler = Callable[[memoryview], int]
+
+class FormatRegistry:
+    def __init__(self, max_cached_aliases: int = 4096):
+        self._handlers: Dict[str, FormatHandler] = {}
+        self._chunk_handlers: Dict[str, ChunkHandler] = {}
+        self._resolved: Dict[str, FormatHandler] = {}
+        self._resolved_chunks: Dict[str, ChunkHandler] = {}
+        self._max_cached_aliases = max_cached_aliases
+    
+    @staticmethod
+    def normalize(audio_type: str) -> str:
+        key = audio_type.strip().lower()
+        if "/" not in key:
+            key = key.lstrip(".")
+        return key
+    
+    def register(self, audio_type: str, handler: FormatHandler,
+                 mime_types: Iterable[str] = (), extensions: Iterable[str] = (),
+                 chunk_handler: Optional[ChunkHandler] = None):
+        for alias in (audio_type, *mime_types, *extensions):
+            key = self.normalize(alias)
+            self._handlers[key] = handler
+            if chunk_handler is None:
+                self._chunk_handlers.pop(key, None)
+            else:
+                self._chunk_handlers[key] = chunk_handler
+        self._resolved.clear()
+        self._resolved_chunks.clear()
+    
+    def unregister(self, audio_type: str):
+        handler = self._handlers.get(self.normalize(audio_type))
+        if handler is None:
+            return
+        for alias in [alias for alias, registered in self._handlers.items() if registered == handler]:
+            del self._handlers[alias]
+            self._chunk_handlers.pop(alias, None)
+        self._resolved.clear()
+        self._resolved_chunks.clear()
+    
+    def resolve(self, audio_type: str) -> Optional[FormatHandler]:
+        handler = self._resolved.get(audio_type)
+        if handler is None:
+            handler = self._handlers.get(self.normalize(audio_type))
+            if handler is not None:
+                if len(self._resolved) >= self._max_cached_aliases:
+                    self._resolved.clear()
+                self._resolved[audio_type] = handler
+        return handler
+    
+    def resolve_chunk(self, audio_type: str) -> Optional[ChunkHandler]:
+        handler = self._resolved_chunks.get(audio_type)
+        if handler is None:
+            handler = self._chunk_handlers.get(self.normalize(audio_type))
+            if handler is not None:
+                if len(self._resolved_chunks) >= self._max_cached_aliases:
+                    self._resolved_chunks.clear()
+                self._resolved_chunks[audio_type] = handler
+        return handler
+    
+    def formats(self):
+        return sorted(self._handlers)
 
 # Adapter for Advanced Media Player
 class AdvancedMediaAdapter(MediaPlayer):
-    def __init__(self):
+    def __init__(self, sink=None):
+        self.sink = sink
         self.advanced_player = AdvancedMediaPlayer()
+        self._formats = FormatRegistry()
+        self.register_formats(self._formats)
+    
+    def register_formats(self, registry: FormatRegistry):
+        registry.register("vlc", self.advanced_player.play_vlc,
+                          mime_types=["video/x-vlc"], extensions=[".vlc"],
+                          chunk_handler=self.advanced_player.decode_vlc)
+        registry.register("mp4", self.advanced_player.play_mp4,
+                          mime_types=["video/mp4"], extensions=[".mp4", ".m4v"],
+                          chunk_handler=self.advanced_player.decode_mp4)
     
     def play(self, audio_type: str, filename: str, output_file=None):
-        if audio_type.lower() == "vlc":
-            self.advanced_player.play_vlc(filename, output_file)
-        elif audio_type.lower() == "mp4":
-            self.advanced_player.play_mp4(filename, output_file)
+        output_file = output_file or self.sink
+        handler = self._formats.resolve(audio_type)
+        if handler:
+            handler(filename, output_file)
         else:
             message = f"Unsupported format: {audio_type}"
-            if output_file:
-                output_file.write(message + "\n")
-            else:
-                print(message)
+            emit(output_file, message)
+    
+    def play_chunk(self, audio_type: str, chunk: memoryview) -> int:
+        handler = self._formats.resolve_chunk(audio_type)
+        return handler(chunk) if handler else 0
 
 # Adapter for Legacy Audio Player
 class LegacyAudioAdapter(MediaPlayer):
-    def __init__(self):
+    def __init__(self, sink=None):
+        self.sink = sink
         self.legacy_player = LegacyAudioPlayer()
+        self._formats = FormatRegistry()
+        self.register_formats(self._formats)
+    
+    def register_formats(self, registry: FormatRegistry):
+        registry.register("mp3", self.legacy_player.play_mp3,
+                          mime_types=["audio/mpeg"], extensions=[".mp3"],
+                          chunk_handler=self.legacy_player.decode_mp3)
+        registry.register("wav", self.legacy_player.play_wav,
+                          mime_types=["audio/wav", "audio/x-wav"], extensions=[".wav"],
+                          chunk_handler=self.legacy_player.decode_wav)
     
     def play(self, audio_type: str, filename: str, output_file=None):
-        if audio_type.lower() == "mp3":
-            self.legacy_player.play_mp3(filename, output_file)
-        elif audio_type.lower() == "wav":
-            self.legacy_player.play_wav(filename, output_file)
+        output_file = output_file or self.sink
+        handler = self._formats.resolve(audio_type)
+        if handler:
+            handler(filename, output_file)
         else:
             message = f"Unsupported format: {audio_type}"
-            if output_file:
-                output_file.write(message + "\n")
-            else:
-                print(message)
+            emit(output_file, message)
+    
+    def play_chunk(self, audio_type: str, chunk: memoryview) -> int:
+        handler = self._formats.resolve_chunk(audio_type)
+        return handler(chunk) if handler else 0
 
 # Media Player that uses adapters
 class UniversalMediaPlayer(MediaPlayer):
-    def __init__(self):
-        self.advanced_adapter = AdvancedMediaAdapter()
-        self.legacy_adapter = LegacyAudioAdapter()
+    def __init__(self, registry: Optional[FormatRegistry] = None, sink=None):
+        self.sink = sink
+        self.advanced_adapter = AdvancedMediaAdapter(sink)
+        self.legacy_adapter = LegacyAudioAdapter(sink)
+        self.formats = registry or FormatRegistry()
+        self.legacy_adapter.register_formats(self.formats)
+        self.advanced_adapter.register_formats(self.formats)
     
     def play(self, audio_type: str, filename: str, output_file=None):
+        output_file = output_file or self.sink
         message = f"Attempting to play {filename} as {audio_type}"
-        if output_file:
-            output_file.write(message + "\n")
-        else:
-            print(message)
+        emit(output_file, message)
         
-        if audio_type.lower() in ["mp3", "wav"]:
-            self.legacy_adapter.play(audio_type, filename, output_file)
-        elif audio_type.lower() in ["vlc", "mp4"]:
-            self.advanced_adapter.play(audio_type, filename, output_file)
+        handler = self.formats.resolve(audio_type)
+        if handler:
+            handler(filename, output_file)
         else:
             message = f"Format {audio_type} not supported by any player"
-            if output_file:
-                output_file.write(message + "\n")
-            else:
-                print(message)
+            emit(output_file, message)
+    
+    def play_chunk(self, audio_type: str, chunk: memoryview) -> int:
+        # Streamed bytes go to the adapter that registered the format
+        handler = self.formats.resolve_chunk(audio_type)
+        return handler(chunk) if handler else 0
 
 def demo_adapter(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
@@ -0,0 +1,103 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+import collections
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
+from structural.adapter_media import MediaPlayer, UniversalMediaPlayer
+from structural.adapter_streaming import StreamingMediaPlayer
+
+class PlaylistStats:
+    def __init__(self):
+        self.played = 0
+        self.failed = 0
+        self.max_buffered = 0
+        self.stall_seconds = 0.0
+        self.elapsed = 0.0
+
+def _close_result(future: Future):
+    if future.done() and not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), "close", None)
+        if close is not None:
+            close()
+
+class PlaylistEngine:
+    # Plays a playlist in order while up to `prefetch` upcoming items are
+    # loaded on a thread pool. The playlist is consumed lazily and at most
+    # `prefetch` loaded-but-unplayed items exist at once, so memory stays
+    # bounded however long the playlist is.
+    #
+    # The loader defaults to the player's own prefetch() (StreamingMediaPlayer
+    # opens the file and reads ahead), and each loaded result is handed back
+    # through the player's play_prefetched() hook so the I/O done ahead of
+    # time is what gets played. Without a player, files are streamed through
+    # a StreamingMediaPlayer over a UniversalMediaPlayer. Players without
+    # prefetch(), such as a bare UniversalMediaPlayer, need an explicit
+    # loader and are called with play().
+    def __init__(self, player: Optional[MediaPlayer] = None, prefetch: int = 4,
+                 loader: Optional[Callable[[str], Any]] = None, max_workers: Optional[int] = None):
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        if player is None:
+            player = UniversalMediaPlayer() if loader is not None else StreamingMediaPlayer()
+        self.player = player
+        self.prefetch = prefetch
+        self.loader = loader or getattr(player, "prefetch", None)
+        if self.loader is None:
+            raise ValueError(f"{type(player).__name__} has no prefetch(); pass a loader to prefetch with")
+        self.max_workers = max_workers or prefetch
+        self.stats = PlaylistStats()
+    
+    def items(self, playlist: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str, Future]]:
+        # Yields (audio_type, filename, future) in playlist order; each future
+        # is already done, holding the loader's result or its exception.
+        # Results with a close() method that are never yielded get closed.
+        window: collections.deque = collections.deque()
+        entries = iter(playlist)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    while True:
+                        while len(window) < self.prefetch:
+                            entry = next(entries, None)
+                            if entry is None:
+                                break
+                            audio_type, filename = entry
+                            window.append((audio_type, filename, executor.submit(self.loader, filename)))
+                        if not window:
+                            break
+                        self.stats.max_buffered = max(self.stats.max_buffered, len(window))
+                        audio_type, filename, future = window.popleft()
+                        if not future.done():
+                            start = time.perf_counter()
+                            future.exception()
+                            self.stats.stall_seconds += time.perf_counter() - start
+                        yield audio_type, filename, future
+                finally:
+                    for _, _, future in window:
+                        future.cancel()
+        finally:
+            for _, _, future in window:
+                _close_result(future)
+    
+    def play(self, playlist: Iterable[Tuple[str, str]], output_file=None) -> PlaylistStats:
+        start = time.perf_counter()
+        play_prefetched = getattr(self.player, "play_prefetched", None)
+        for audio_type, filename, future in self.items(playlist):
+            error = future.exception()
+            if error is not None:
+                self.stats.failed += 1
+                message = f"Could not load {filename}: {error}"
+                emit(output_file, message)
+                continue
+            loaded = future.result()
+            if play_prefetched is not None and loaded is not None:
+                play_prefetched(audio_type, filename, loaded, output_file)
+            else:
+                self.player.play(audio_type, filename, output_file)
+            self.stats.played += 1
+        self.stats.elapsed += time.perf_counter() - start
+        return self.stats
@@ -0,0 +1,191 @@
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import mmap
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
+from structural.adapter_media import MediaPlayer, UniversalMediaPlayer
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# (offset, magic bytes, format); checked in order, so more specific
+# signatures come before the generic ones sharing a prefix
+MAGIC_SIGNATURES: Tuple[Tuple[int, bytes, str], ...] = (
+    (8, b"WAVE", "wav"),
+    (8, b"AVI ", "avi"),
+    (4, b"ftyp", "mp4"),
+    (0, b"ID3", "mp3"),
+    (0, b"\xff\xfb", "mp3"),
+    (0, b"\xff\xf3", "mp3"),
+    (0, b"\xff\xf2", "mp3"),
+    (0, b"fLaC", "flac"),
+    (0, b"OggS", "ogg"),
+)
+SNIFF_BYTES = max(offset + len(magic) for offset, magic, _ in MAGIC_SIGNATURES)
+
+def sniff_format(header) -> Optional[str]:
+    # header is any bytes-like object holding at least the first SNIFF_BYTES
+    # bytes of the file; returns None when no signature matches
+    for offset, magic, audio_type in MAGIC_SIGNATURES:
+        if header[offset:offset + len(magic)] == magic:
+            return audio_type
+    return None
+
+def _read_file(f, buffer: bytearray, head: bytes = b"") -> Iterator[memoryview]:
+    # head holds bytes already read from f; it is handed out first, in
+    # buffer-sized views, before reading the rest into the buffer
+    chunk_size = len(buffer)
+    if head:
+        with memoryview(head) as view:
+            for start in range(0, len(head), chunk_size):
+                with view[start:start + chunk_size] as chunk:
+                    yield chunk
+    with memoryview(buffer) as view:
+        while True:
+            count = f.readinto(view)
+            if not count:
+                break
+            with view[:count] as chunk:
+                yield chunk
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                buffer: Optional[bytearray] = None) -> Iterator[memoryview]:
+    # readinto a single reusable buffer; every chunk is a view over it, so it
+    # is overwritten by the next read and released once the consumer moves on
+    buffer = buffer if buffer is not None else bytearray(chunk_size)
+    with open(path, "rb", buffering=0) as f:
+        yield from _read_file(f, buffer)
+
+def map_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+    # Chunks are views straight into the page cache; nothing is copied. Pages
+    # already consumed are dropped from the mapping so resident memory stays
+    # around one chunk even for multi-GB files.
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            can_advise = hasattr(mapped, "madvise")
+            if can_advise:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            with memoryview(mapped) as view:
+                for start in range(0, size, chunk_size):
+                    with view[start:start + chunk_size] as chunk:
+                        yield chunk
+                    end = min(start + chunk_size, size) // mmap.PAGESIZE * mmap.PAGESIZE
+                    if can_advise and end > released:
+                        mapped.madvise(mmap.MADV_DONTNEED, released, end - released)
+                        released = end
+
+class PrefetchedMedia:
+    # A file opened ahead of playback together with its first bytes
+    __slots__ = ("path", "file", "head")
+    
+    def __init__(self, path: str, file, head: bytes):
+        self.path = path
+        self.file = file
+        self.head = head
+    
+    def close(self):
+        self.file.close()
+
+class FormatThroughput:
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+    
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+class StreamingMediaPlayer:
+    # Pushes files through a MediaPlayer chunk by chunk. The format comes from
+    # the file's magic bytes, falling back to the caller's audio_type and then
+    # the extension; memory use is one chunk buffer however large the file.
+    #
+    # prefetch() does the slow part of opening a file (open plus reading the
+    # first prefetch_bytes) so it can run ahead on another thread, e.g. from
+    # a PlaylistEngine; play_prefetched() then streams from where it stopped.
+    def __init__(self, player: Optional[MediaPlayer] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 use_mmap: bool = False, clock: Callable[[], float] = time.perf_counter,
+                 prefetch_bytes: Optional[int] = None):
+        self.player = player or UniversalMediaPlayer()
+        self.chunk_size = max(chunk_size, SNIFF_BYTES)
+        self.prefetch_bytes = max(prefetch_bytes or self.chunk_size, SNIFF_BYTES)
+        self.use_mmap = use_mmap
+        self._clock = clock
+        self._buffer = bytearray(self.chunk_size)
+        self.throughput: Dict[str, FormatThroughput] = {}
+    
+    def _open(self, path: str):
+        return open(path, "rb", buffering=0)
+    
+    def _read_chunks(self, path: str) -> Iterator[memoryview]:
+        with self._open(path) as f:
+            yield from _read_file(f, self._buffer)
+    
+    def _prefetched_chunks(self, prefetched: PrefetchedMedia) -> Iterator[memoryview]:
+        with prefetched.file:
+            yield from _read_file(prefetched.file, self._buffer, prefetched.head)
+    
+    def _chunks(self, path: str, prefetched: Optional[PrefetchedMedia] = None) -> Iterator[memoryview]:
+        # Prefetched files always continue with readinto on the open handle
+        if prefetched is not None:
+            return self._prefetched_chunks(prefetched)
+        if self.use_mmap:
+            return map_chunks(path, self.chunk_size)
+        return self._read_chunks(path)
+    
+    def prefetch(self, path: str) -> PrefetchedMedia:
+        f = self._open(path)
+        try:
+            head = f.read(self.prefetch_bytes)
+        except BaseException:
+            f.close()
+            raise
+        return PrefetchedMedia(path, f, head)
+    
+    def play_prefetched(self, audio_type: Optional[str], path: str, prefetched: PrefetchedMedia,
+                        output_file=None) -> int:
+        return self.stream(path, audio_type, output_file, prefetched)
+    
+    def stream(self, path: str, audio_type: Optional[str] = None, output_file=None,
+               prefetched: Optional[PrefetchedMedia] = None) -> int:
+        # Returns the number of bytes handed to the player
+        start = self._clock()
+        chunks = self._chunks(path, prefetched)
+        try:
+            first = next(chunks, None)
+            detected = sniff_format(first) if first is not None else None
+            audio_type = detected or audio_type or os.path.splitext(path)[1].lstrip(".")
+            filename = os.path.basename(path)
+            formats = getattr(self.player, "formats", None)
+            supported = formats is None or formats.resolve(audio_type) is not None
+            self.player.play(audio_type, filename, output_file)
+            if not supported or first is None:
+                return 0
+            
+            play_chunk = self.player.play_chunk
+            total = play_chunk(audio_type, first)
+            for chunk in chunks:
+                total += play_chunk(audio_type, chunk)
+        finally:
+            chunks.close()
+            if prefetched is not None:
+                prefetched.close()
+        
+        stats = self.throughput.setdefault(audio_type.lower(), FormatThroughput())
+        stats.files += 1
+        stats.bytes += total
+        stats.seconds += self._clock() - start
+        return total
+    
+    def report(self, output_file=None):
+        for audio_type, stats in sorted(self.throughput.items()):
+            message = (f"{audio_type}: {stats.files} files, {stats.bytes / 1e6:.1f} MB "
+                       f"at {stats.mb_per_second:.1f} MB/s")
+            emit(output_file, message)
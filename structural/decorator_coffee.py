@@ -21,50 +21,54 @@ class SimpleCoffee(Coffee):
 
 # Base Decorator
 class CoffeeDecorator(Coffee):
+    # Add-ons declare their price and description suffix. The running cost is
+    # taken from the wrapped coffee once, at construction, and the description
+    # is assembled on first use by walking the chain iteratively and joining
+    # the parts once, so queries are O(1) and chains of any depth work.
+    _cost_delta = 0.0
+    _suffix = ""
+    
     def __init__(self, coffee: Coffee):
         self._coffee = coffee
+        self._cost = coffee.get_cost() + self._cost_delta
+        self._description = None
     
     def get_cost(self) -> float:
-        return self._coffee.get_cost()
+        return self._cost
     
     def get_description(self) -> str:
-        return self._coffee.get_description()
+        if self._description is None:
+            parts = []
+            node = self
+            while (isinstance(node, CoffeeDecorator) and node._description is None
+                   and type(node).get_description is CoffeeDecorator.get_description):
+                parts.append(node._suffix)
+                node = node._coffee
+            parts.append(node.get_description())
+            parts.reverse()
+            self._description = "".join(parts)
+        return self._description
 
 # Concrete Decorators
 class MilkDecorator(CoffeeDecorator):
-    def get_cost(self) -> float:
-        return self._coffee.get_cost() + 0.50
-    
-    def get_description(self) -> str:
-        return self._coffee.get_description() + ", milk"
+    _cost_delta = 0.50
+    _suffix = ", milk"
 
 class SugarDecorator(CoffeeDecorator):
-    def get_cost(self) -> float:
-        return self._coffee.get_cost() + 0.25
-    
-    def get_description(self) -> str:
-        return self._coffee.get_description() + ", sugar"
+    _cost_delta = 0.25
+    _suffix = ", sugar"
 
 class WhippedCreamDecorator(CoffeeDecorator):
-    def get_cost(self) -> float:
-        return self._coffee.get_cost() + 0.75
-    
-    def get_description(self) -> str:
-        return self._coffee.get_description() + ", whipped cream"
+    _cost_delta = 0.75
+    _suffix = ", whipped cream"
 
 class CaramelDecorator(CoffeeDecorator):
-    def get_cost(self) -> float:
-        return self._coffee.get_cost() + 1.00
-    
-    def get_description(self) -> str:
-        return self._coffee.get_description() + ", caramel"
+    _cost_delta = 1.00
+    _suffix = ", caramel"
 
 class ChocolateDecorator(CoffeeDecorator):
-    def get_cost(self) -> float:
-        return self._coffee.get_cost() + 0.80
-    
-    def get_description(self) -> str:
-        return self._coffee.get_description() + ", chocolate"
+    _cost_delta = 0.80
+    _suffix = ", chocolate"
 
 def demo_decorator(results_dir="results"):
     os.makedirs(results_dir, exist_ok=True)
@@ -0,0 +1,74 @@
+from typing import Iterable, Optional, Sequence, Type
+import collections
+import os
+import sys
+import weakref
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.decorator_coffee import Coffee, CoffeeDecorator, SimpleCoffee
+
+class DrinkInterner:
+    # Hash-conses decorator stacks: wrapping the same inner drink with the same
+    # decorator type returns one shared instance, so identical drinks are
+    # built once and share their cached cost and description. Entries are
+    # keyed by (decorator type, id(inner)); a shared decorator keeps its inner
+    # drink alive, so the id cannot be reused while the entry exists. The
+    # cache holds drinks weakly, plus strong references to the max_strong most
+    # recently used ones so popular drinks survive between orders.
+    def __init__(self, max_strong: int = 1024, base: Optional[Coffee] = None):
+        self.base = base or SimpleCoffee()
+        self.max_strong = max_strong
+        self._drinks: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+        self._recent: collections.OrderedDict = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def wrap(self, decorator: Type[CoffeeDecorator], coffee: Coffee) -> CoffeeDecorator:
+        key = (decorator, id(coffee))
+        drink = self._drinks.get(key)
+        if drink is None or drink._coffee is not coffee:
+            self.misses += 1
+            drink = decorator(coffee)
+            self._drinks[key] = drink
+        else:
+            self.hits += 1
+        recent = self._recent
+        recent[key] = drink
+        recent.move_to_end(key)
+        if len(recent) > self.max_strong:
+            recent.popitem(last=False)
+        return drink
+    
+    def build(self, toppings: Iterable[Type[CoffeeDecorator]], coffee: Optional[Coffee] = None,
+              normalize: bool = False) -> Coffee:
+        # Applies toppings innermost first. With normalize=True the add-ons are
+        # treated as commutative and put in a canonical order first, so "milk
+        # then sugar" and "sugar then milk" share one drink; the description
+        # then follows the canonical order rather than the order given.
+        toppings = self.canonical_order(toppings) if normalize else toppings
+        drink = self.base if coffee is None else coffee
+        for topping in toppings:
+            drink = self.wrap(topping, drink)
+        return drink
+    
+    @staticmethod
+    def canonical_order(toppings: Iterable[Type[CoffeeDecorator]]) -> Sequence[Type[CoffeeDecorator]]:
+        # Deterministic across processes and runs: topping types sort by name
+        return sorted(toppings, key=lambda topping: (topping.__module__, topping.__qualname__))
+    
+    def __len__(self) -> int:
+        return len(self._drinks)
+    
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "drinks": len(self._drinks),
+            "pinned": len(self._recent),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+    
+    def clear(self):
+        self._recent.clear()
+        self._drinks.clear()
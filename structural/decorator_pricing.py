@@ -0,0 +1,124 @@
+from array import array
+from operator import mul
+from typing import Dict, Iterable, List, Sequence, Tuple, Type
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from structural.decorator_coffee import (CaramelDecorator, ChocolateDecorator, Coffee, CoffeeDecorator,
+                                         MilkDecorator, SimpleCoffee, SugarDecorator, WhippedCreamDecorator)
+
+DEFAULT_TOPPINGS: Tuple[Type[CoffeeDecorator], ...] = (
+    MilkDecorator, SugarDecorator, WhippedCreamDecorator, CaramelDecorator, ChocolateDecorator,
+)
+
+def _cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+class ToppingMatrix:
+    # Orders x topping types, stored row-major in one flat array('I'); cell
+    # (i, j) is how many times order i adds toppings[j]
+    def __init__(self, toppings: Sequence[Type[CoffeeDecorator]] = DEFAULT_TOPPINGS, counts=None):
+        self.toppings = tuple(toppings)
+        self.width = len(self.toppings)
+        self.counts = array("I") if counts is None else array("I", counts)
+        if len(self.counts) % self.width:
+            raise ValueError(f"Count array length {len(self.counts)} is not a multiple of {self.width}")
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[int]],
+                  toppings: Sequence[Type[CoffeeDecorator]] = DEFAULT_TOPPINGS) -> "ToppingMatrix":
+        matrix = cls(toppings)
+        for row in rows:
+            matrix.add(row)
+        return matrix
+    
+    @classmethod
+    def from_orders(cls, orders: Iterable[Coffee],
+                    toppings: Sequence[Type[CoffeeDecorator]] = DEFAULT_TOPPINGS) -> "ToppingMatrix":
+        # Decomposes existing decorator chains into topping counts
+        matrix = cls(toppings)
+        column = {topping: j for j, topping in enumerate(matrix.toppings)}
+        for coffee in orders:
+            row = [0] * matrix.width
+            while isinstance(coffee, CoffeeDecorator):
+                j = column.get(type(coffee))
+                if j is None:
+                    raise ValueError(f"{type(coffee).__name__} is not one of the matrix toppings")
+                row[j] += 1
+                coffee = coffee._coffee
+            if type(coffee) is not SimpleCoffee:
+                raise ValueError(f"Cannot bulk price drinks based on {type(coffee).__name__}")
+            matrix.counts.extend(row)
+        return matrix
+    
+    def add(self, row: Sequence[int]):
+        if len(row) != self.width:
+            raise ValueError(f"Expected {self.width} topping counts, got {len(row)}")
+        self.counts.extend(row)
+    
+    def __len__(self) -> int:
+        return len(self.counts) // self.width
+    
+    def row(self, index: int) -> Tuple[int, ...]:
+        start = index * self.width
+        return tuple(self.counts[start:start + self.width])
+    
+    def rows(self):
+        return zip(*[iter(self.counts)] * self.width)
+
+class BulkPricer:
+    # Prices whole order books at once. The price vector is read from the
+    # decorators' _cost_delta and the work is done in integer cents, so totals
+    # match get_cost() on the equivalent decorator chain to the cent. Orders
+    # tend to repeat a few hundred configurations, so each distinct row is
+    # priced and described only once (up to max_cached_rows distinct rows).
+    def __init__(self, toppings: Sequence[Type[CoffeeDecorator]] = DEFAULT_TOPPINGS, base: Coffee = None,
+                 max_cached_rows: int = 65_536):
+        self.toppings = tuple(toppings)
+        self.base = base or SimpleCoffee()
+        self.base_cents = _cents(self.base.get_cost())
+        self.price_vector = array("q", (_cents(topping._cost_delta) for topping in self.toppings))
+        self.max_cached_rows = max_cached_rows
+        self._row_cents: Dict[Tuple[int, ...], int] = {}
+        self._row_descriptions: Dict[Tuple[int, ...], str] = {}
+    
+    def _check(self, matrix: ToppingMatrix):
+        if matrix.toppings != self.toppings:
+            raise ValueError("Topping matrix columns do not match the pricer's toppings")
+    
+    def totals_cents(self, matrix: ToppingMatrix) -> array:
+        self._check(matrix)
+        cache = self._row_cents
+        prices = self.price_vector
+        base = self.base_cents
+        totals = array("q")
+        append = totals.append
+        for row in matrix.rows():
+            total = cache.get(row)
+            if total is None:
+                if len(cache) >= self.max_cached_rows:
+                    cache.clear()
+                total = cache[row] = base + sum(map(mul, row, prices))
+            append(total)
+        return totals
+    
+    def totals(self, matrix: ToppingMatrix) -> List[float]:
+        return [cents / 100 for cents in self.totals_cents(matrix)]
+    
+    def descriptions(self, matrix: ToppingMatrix) -> List[str]:
+        # Toppings are listed in column order, each repeated by its count
+        self._check(matrix)
+        cache = self._row_descriptions
+        base = self.base.get_description()
+        suffixes = [topping._suffix for topping in self.toppings]
+        descriptions = []
+        for row in matrix.rows():
+            description = cache.get(row)
+            if description is None:
+                if len(cache) >= self.max_cached_rows:
+                    cache.clear()
+                description = cache[row] = base + "".join(
+                    suffix * count for suffix, count in zip(suffixes, row))
+            descriptions.append(description)
+        return descriptions
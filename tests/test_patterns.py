@@ -2,12 +2,37 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from behavioral.observer_stock_market import Stock, MobileApp
-from behavioral.strategy_payment import PaymentProcessor, CreditCardPayment
-from creational.factory_vehicles import VehicleFactory, VehicleType
+from behavioral.observer_stock_market import Stock, MobileApp, TradingBot, Market, StockObserver
+from behavioral.observer_registry import SubscriptionRegistry
+from behavioral.observer_async import AsyncStock, AsyncStockObserver, OverflowPolicy
+from behavioral.observer_triggers import CrossDirection, PriceTriggerEngine
+from behavioral.observer_conflation import ConflatingObserver, ConflationGroup
+from behavioral.observer_journal import TickJournal
+from behavioral.observer_shared import ProcessObserverPool
+from behavioral.strategy_payment import IdempotencyCache, PaymentProcessor, PaymentStrategy, CreditCardPayment, PayPalPayment
+from behavioral.strategy_async import AsyncCreditCardPayment, AsyncPaymentProcessor, AsyncPayPalPayment, ConnectionPool
+from behavioral.strategy_routing import AdaptiveRoutingStrategy, CircuitState
+import main
+from common.output_sink import BatchingSink, FileSink, JsonLinesSink, MemorySink, NullSink, emit
+from creational.factory_vehicles import Vehicle, VehicleFactory, VehicleType, register_vehicle
+from creational.factory_fleet import Fleet, create_many
+from creational.factory_pool import ThreadSafeVehiclePool, VehiclePool
 from creational.singleton_config import ConfigurationManager
-from structural.decorator_coffee import SimpleCoffee, MilkDecorator
+from creational.config_shared import SharedConfigStore
+import multiprocessing
+from structural.adapter_media import AdvancedMediaAdapter, LegacyAudioAdapter, UniversalMediaPlayer
+from structural.adapter_playlist import PlaylistEngine
+from structural.adapter_streaming import PrefetchedMedia, StreamingMediaPlayer, sniff_format
+from structural.decorator_coffee import CoffeeDecorator, SimpleCoffee, MilkDecorator, SugarDecorator, CaramelDecorator
+from structural.decorator_interning import DrinkInterner
+from structural.decorator_pricing import BulkPricer, ToppingMatrix
 import tempfile
+import io
+import json
+import asyncio
+import time
+import gc
+import threading
 
 def test_observer():
     stock = Stock("TEST", 100)
@@ -23,6 +48,282 @@ def test_observer():
             assert "StockTracker Pro" in content
     os.unlink(f.name)
 
+def test_market_batch_ticks():
+    class BatchRecorder(StockObserver):
+        def __init__(self):
+            self.batches = []
+        
+        def update(self, stock_symbol: str, price: float, output_file=None):
+            raise AssertionError("update_batch should be used")
+        
+        def update_batch(self, symbols, prices, output_file=None):
+            self.batches.append((list(symbols), list(prices)))
+    
+    market = Market({"AAPL": 145.50, "GOOGL": 2750.00})
+    recorder = BatchRecorder()
+    bot = TradingBot()
+    market.add_observer(recorder)
+    market.add_observer(bot)
+    
+    out = io.StringIO()
+    changed = market.apply_ticks([("AAPL", 150.0), ("GOOGL", 2750.00), ("AAPL", 160.0), ("MSFT", 90.0)], out)
+    assert changed == ["AAPL", "MSFT"]
+    assert recorder.batches == [(["AAPL", "MSFT"], [160.0, 90.0])]
+    assert market.get_price("AAPL") == 160.0
+    assert "Selling AAPL" in out.getvalue()
+    assert "Buying MSFT" in out.getvalue()
+    
+    # A batch without any price change notifies nobody
+    assert market.apply_ticks([("AAPL", 160.0)], out) == []
+    assert len(recorder.batches) == 1
+    
+    # Overlapping subscriptions still deliver one batch per observer
+    market.add_observer(recorder, "AAPL")
+    market.add_observer(recorder, "AA*")
+    market.apply_ticks([("AAPL", 170.0)], out)
+    assert recorder.batches[1:] == [(["AAPL"], [170.0])]
+
+def test_async_dispatch_slow_consumer():
+    class SlowDashboard(AsyncStockObserver):
+        def __init__(self):
+            self.prices = []
+        
+        async def update(self, stock_symbol: str, price: float, output_file=None):
+            await asyncio.sleep(0.02)
+            self.prices.append(price)
+    
+    class FastRecorder(AsyncStockObserver):
+        def __init__(self):
+            self.prices = []
+        
+        async def update(self, stock_symbol: str, price: float, output_file=None):
+            self.prices.append(price)
+    
+    async def scenario():
+        stock = AsyncStock("TEST", 100.0)
+        slow = SlowDashboard()
+        fast = FastRecorder()
+        stock.add_observer(slow, maxsize=4, policy=OverflowPolicy.DROP_OLDEST)
+        stock.add_observer(fast, maxsize=1000)
+        
+        producer_time = 0.0
+        for i in range(1, 201):
+            start = time.perf_counter()
+            await stock.set_price(100.0 + i)
+            producer_time += time.perf_counter() - start
+            await asyncio.sleep(0)
+        await stock.dispatcher.join()
+        
+        # The producer never waits on the slow subscriber: waiting on it even
+        # for a quarter of the updates would cost 50 * 0.02s
+        assert producer_time < 200 * 0.02 / 4
+        assert fast.prices == [100.0 + i for i in range(1, 201)]
+        assert slow.prices[-1] == 300.0
+        stats = stock.dispatcher.stats(slow)
+        assert stats["dropped"] > 0
+        assert stats["delivered"] + stats["dropped"] == 200
+        await stock.dispatcher.close()
+    
+    asyncio.run(scenario())
+
+def test_subscription_registry():
+    registry = SubscriptionRegistry()
+    exact_app = MobileApp("Exact")
+    prefix_app = MobileApp("Prefix")
+    all_app = MobileApp("All")
+    registry.subscribe(exact_app, "AAPL")
+    registry.subscribe(prefix_app, "AA*")
+    registry.subscribe(all_app, "*")
+    
+    assert registry.observers_for("AAPL") == [exact_app, prefix_app, all_app]
+    assert registry.observers_for("AAL") == [prefix_app, all_app]
+    assert registry.observers_for("MSFT") == [all_app]
+    
+    registry.unsubscribe(prefix_app, "AA*")
+    assert registry.observers_for("AAL") == [all_app]
+    
+    # Stocks sharing the registry also reach wildcard subscribers
+    stock = Stock("AAPL", 100, registry)
+    out = io.StringIO()
+    stock.set_price(110, out)
+    assert "[Exact]" in out.getvalue() and "[All]" in out.getvalue()
+    stock.remove_observer(exact_app)
+    assert registry.observers_for("AAPL") == [all_app]
+    
+    # Collected observers disappear without an explicit unsubscribe
+    del all_app
+    gc.collect()
+    assert registry.observers_for("MSFT") == []
+    assert len(registry) == 0
+
+def test_price_trigger_engine():
+    fired = []
+    
+    def record(rule, stock_symbol, price, direction, output_file=None):
+        fired.append((rule.level, direction))
+    
+    engine = PriceTriggerEngine()
+    engine.add_rule("AAPL", 150, CrossDirection.UP, record)
+    engine.add_rule("AAPL", 100, CrossDirection.DOWN, record, one_shot=True)
+    engine.add_rule("AAPL", 120, CrossDirection.BOTH, record)
+    
+    stock = Stock("AAPL", 145.50)
+    stock.add_observer(engine)
+    engine.set_reference_price("AAPL", 145.50)
+    
+    stock.set_price(152.30)
+    assert fired == [(150, CrossDirection.UP)]
+    stock.set_price(95.80)
+    assert fired[1:] == [(120, CrossDirection.DOWN), (100, CrossDirection.DOWN)]
+    
+    # The one-shot rule is gone; the recurring ones keep firing
+    stock.set_price(130.0)
+    stock.set_price(90.0)
+    assert fired[3:] == [(120, CrossDirection.UP), (120, CrossDirection.DOWN)]
+    assert engine.rule_count("AAPL") == 2
+    
+    out = io.StringIO()
+    engine.add_rule("AAPL", 91, CrossDirection.UP)
+    engine.update("AAPL", 91.0, out)
+    assert "AAPL crossed up through $91.00" in out.getvalue()
+
+def test_conflating_observer():
+    now = [0.0]
+    group = ConflationGroup(clock=lambda: now[0])
+    dashboard = MobileApp("Dashboard")
+    conflating = group.wrap(dashboard)
+    
+    stock = Stock("AAPL", 100.0)
+    stock.add_observer(conflating)
+    out = io.StringIO()
+    for i in range(1, 1001):
+        stock.set_price(100.0 + i, out)
+    assert out.getvalue() == ""
+    
+    assert group.flush() == 1
+    assert out.getvalue() == "[Dashboard] Stock AAPL price updated: $1100.00\n"
+    assert group.stats()[dashboard] == {"received": 1000, "coalesced": 999, "delivered": 1, "pending": 0}
+    
+    # Rate-limited delivery flushes on its own once the interval has passed
+    limited = ConflatingObserver(dashboard, max_rate=10, clock=lambda: now[0])
+    out = io.StringIO()
+    limited.update("AAPL", 1.0, out)
+    limited.update("AAPL", 2.0, out)
+    now[0] = 0.1
+    limited.update("AAPL", 3.0, out)
+    assert out.getvalue() == "[Dashboard] Stock AAPL price updated: $3.00\n"
+    
+    # A running group timer delivers the tail of a burst without more updates
+    timed = ConflationGroup()
+    conflating = timed.wrap(dashboard)
+    out = io.StringIO()
+    timed.start(0.01)
+    try:
+        conflating.update("AAPL", 4.0, out)
+        conflating.update("AAPL", 5.0, out)
+        deadline = time.monotonic() + 2
+        while "$5.00" not in out.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert out.getvalue().endswith("[Dashboard] Stock AAPL price updated: $5.00\n")
+    finally:
+        timed.stop()
+    assert conflating.pending == 0 and timed.flush() == 0
+    
+    # A producer flush while the timer is still delivering waits its turn,
+    # so the older price cannot land after the newer one
+    class SlowRecorder(StockObserver):
+        def __init__(self):
+            self.seen = []
+            self.delivering = threading.Event()
+        
+        def update(self, stock_symbol: str, price: float, output_file=None):
+            self.seen.append(price)
+        
+        def update_batch(self, symbols, prices, output_file=None):
+            if not self.delivering.is_set():
+                self.delivering.set()
+                time.sleep(0.05)
+            self.seen.extend(prices)
+    
+    recorder = SlowRecorder()
+    conflating = timed.wrap(recorder)
+    conflating.update("AAPL", 4.0)
+    timed.start(0.001)
+    try:
+        assert recorder.delivering.wait(2)
+        conflating.update("AAPL", 5.0)
+        conflating.flush()
+    finally:
+        timed.stop()
+    assert recorder.seen == [4.0, 5.0]
+    assert conflating.stats()["delivered"] == 2
+
+def test_tick_journal_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticks.bin")
+        with TickJournal(path, initial_capacity=2) as journal:
+            stock = Stock("AAPL", 145.50, journal=journal)
+            stock.set_price(148.75)
+            stock.set_price(152.30)
+            stock.set_price(95.80)
+            for i, price in enumerate([2800.50, 2790.00]):
+                journal.append("GOOGL", price, timestamp=time.time_ns() + i)
+            assert len(journal) == 5
+        
+        # Reopening maps the same file and restores the symbol table
+        with TickJournal(path) as journal:
+            assert [price for _, _, price in journal.records()] == [148.75, 152.30, 95.80, 2800.50, 2790.00]
+            
+            registry = SubscriptionRegistry()
+            bot = TradingBot()
+            app = MobileApp("Replay")
+            registry.subscribe(bot, "AAPL")
+            registry.subscribe(app, "*")
+            out = io.StringIO()
+            assert journal.replay(registry, output_file=out) == 5
+            lines = out.getvalue().splitlines()
+            assert lines[0] == "[TradingBot] Monitoring AAPL at $148.75"
+            assert lines[-1] == "[Replay] Stock GOOGL price updated: $2790.00"
+            
+            first_google = list(journal.records())[3][1]
+            out = io.StringIO()
+            assert journal.replay([app], start_ts=first_google, batch_size=10, output_file=out) == 2
+            assert out.getvalue().count("GOOGL") == 2
+            
+            # Batched replay into plain observers delivers the same ticks in order
+            class Collector(StockObserver):
+                def __init__(self):
+                    self.ticks = []
+                
+                def update(self, stock_symbol: str, price: float, output_file=None):
+                    self.ticks.append((stock_symbol, price))
+            
+            per_tick, batched = Collector(), Collector()
+            journal.replay([per_tick])
+            assert journal.replay([batched], batch_size=2) == 5
+            assert batched.ticks == per_tick.ticks == [(symbol, price) for symbol, _, price in journal.records()]
+
+class FileRecorder(StockObserver):
+    def __init__(self, path):
+        self.path = path
+    
+    def update(self, stock_symbol: str, price: float, output_file=None):
+        with open(self.path, "a") as f:
+            f.write(f"{stock_symbol} {price:.2f}\n")
+
+def test_process_observer_pool():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorders = [FileRecorder(os.path.join(tmp, f"observer{i}.txt")) for i in range(3)]
+        with ProcessObserverPool(["AAPL", "GOOGL"], recorders, workers=2) as pool:
+            pool.wait(pool.publish([("AAPL", 148.75), ("GOOGL", 2800.50)]), timeout=10)
+            pool.wait(pool.publish([("AAPL", 152.30)]), timeout=10)
+            # Unchanged prices are not delivered again
+            assert pool.wait(pool.publish([("GOOGL", 2800.50)]), timeout=10)
+        
+        for recorder in recorders:
+            with open(recorder.path) as f:
+                assert f.read().splitlines() == ["AAPL 148.75", "GOOGL 2800.50", "AAPL 152.30"]
+
 def test_strategy():
     processor = PaymentProcessor()
     credit_card = CreditCardPayment("1111222233334444", "12/25", "123")
@@ -36,6 +337,192 @@ def test_strategy():
             assert "credit card" in content.lower()
     os.unlink(f.name)
 
+def test_execute_batch():
+    class FlakyGateway(PaymentStrategy):
+        def process_payment(self, amount: float, output_file=None) -> bool:
+            if amount > 100:
+                raise RuntimeError("declined")
+            return amount > 0
+    
+    processor = PaymentProcessor()
+    card = CreditCardPayment("1111222233334444", "12/25", "123")
+    paypal = PayPalPayment("user@example.com")
+    flaky = FlakyGateway()
+    jobs = [(card, 10.0), (flaky, 50.0), (paypal, 20.0), (flaky, 150.0), (card, 30.0), (flaky, -1.0)]
+    
+    out = io.StringIO()
+    batch = processor.execute_batch(jobs, max_workers=4, per_strategy_limit=2, output_file=out)
+    results = batch.run()
+    assert [result.index for result in results] == list(range(len(jobs)))
+    assert [result.success for result in results] == [True, True, True, False, True, False]
+    assert isinstance(results[3].error, RuntimeError)
+    assert batch.stats[flaky].processed == 3 and batch.stats[flaky].failures == 2
+    assert batch.stats[card].failures == 0
+    assert batch.failures == 2
+    assert out.getvalue().count("Processing credit card payment") == 2
+    
+    unordered = processor.execute_batch(jobs, ordered=False, output_file=io.StringIO())
+    assert sorted(result.index for result in unordered) == list(range(len(jobs)))
+    
+    class SlowGateway(PaymentStrategy):
+        def process_payment(self, amount: float, output_file=None) -> bool:
+            time.sleep(0.001)
+            return True
+    
+    # Strategies progress side by side and jobs are read lazily
+    gateways = [SlowGateway(), SlowGateway(), SlowGateway()]
+    consumed = [0]
+    
+    def interleaved(count):
+        for i in range(count):
+            consumed[0] += 1
+            yield gateways[i % 3], float(i)
+    
+    batch = processor.execute_batch(interleaved(600), max_workers=8, per_strategy_limit=4, window=32)
+    results = iter(batch)
+    assert next(results).index == 0
+    assert consumed[0] <= 32
+    assert [result.index for result in results] == list(range(1, 600))
+    assert batch.total == 600
+    assert batch.stats[gateways[2]].first_start < batch.stats[gateways[0]].last_finish
+
+def test_async_payments_share_pool():
+    latency = 0.02
+    
+    async def gateway(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            await asyncio.sleep(latency)
+            writer.write(b"OK\n" if line.startswith(b"PAY ") else b"ERR\n")
+            await writer.drain()
+        writer.close()
+    
+    async def scenario():
+        server = await asyncio.start_server(gateway, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ConnectionPool("127.0.0.1", port, max_connections=50, acquire_timeout=5)
+        processor = AsyncPaymentProcessor()
+        
+        processor.set_payment_strategy(AsyncCreditCardPayment(pool, "1111222233334444", "12/25", "123"))
+        out = io.StringIO()
+        start = time.perf_counter()
+        results = await processor.execute_many([10.0] * 200, output_file=out)
+        elapsed = time.perf_counter() - start
+        assert results == [True] * 200
+        # The sync path would need 200 * latency seconds one after another
+        assert elapsed < 200 * latency / 4
+        assert pool.opened <= 50
+        
+        processor.set_payment_strategy(AsyncPayPalPayment(pool, "user@example.com"))
+        assert await processor.execute_payment(149.50, out)
+        assert pool.reused > 0
+        assert "Processing PayPal payment of $149.50" in out.getvalue()
+        
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+    
+    asyncio.run(scenario())
+
+def test_idempotent_payments():
+    class SlowGateway(PaymentStrategy):
+        def __init__(self, approve=True):
+            self.calls = 0
+            self.approve = approve
+        
+        def process_payment(self, amount: float, output_file=None) -> bool:
+            self.calls += 1
+            time.sleep(0.05)
+            return self.approve
+    
+    now = [0.0]
+    cache = IdempotencyCache(max_entries=2, ttl=60, clock=lambda: now[0])
+    processor = PaymentProcessor(cache)
+    gateway = SlowGateway()
+    processor.set_payment_strategy(gateway)
+    
+    # Concurrent retries of the same payment run the gateway once
+    threads = [threading.Thread(target=processor.execute_payment, args=(10.0, None, "order-1")) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert gateway.calls == 1
+    assert processor.execute_payment(10.0, idempotency_key="order-1")
+    assert gateway.calls == 1
+    
+    processor.execute_payment(20.0, idempotency_key="order-2")
+    processor.execute_payment(30.0, idempotency_key="order-3")
+    assert len(cache) == 2 and cache.evictions == 1
+    
+    now[0] = 61
+    processor.execute_payment(30.0, idempotency_key="order-3")
+    assert gateway.calls == 4
+    stats = cache.stats()
+    assert stats["misses"] == 4 and stats["expirations"] >= 1
+    assert stats["hits"] + stats["coalesced"] >= 5
+    
+    # Reusing a key for a different amount or strategy is rejected, not replayed
+    for amount, strategy in ((35.0, gateway), (30.0, SlowGateway())):
+        processor.set_payment_strategy(strategy)
+        try:
+            processor.execute_payment(amount, idempotency_key="order-3")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("mismatched idempotency key was accepted")
+    assert gateway.calls == 4
+    
+    # A declined payment is not replayed; the retry reaches the gateway again
+    declining = SlowGateway(approve=False)
+    processor.set_payment_strategy(declining)
+    assert not processor.execute_payment(40.0, idempotency_key="order-4")
+    declining.approve = True
+    assert processor.execute_payment(40.0, idempotency_key="order-4")
+    assert declining.calls == 2
+
+def test_adaptive_routing():
+    class FakeRail(PaymentStrategy):
+        def __init__(self, healthy=True):
+            self.healthy = healthy
+            self.calls = 0
+        
+        def process_payment(self, amount: float, output_file=None) -> bool:
+            self.calls += 1
+            if not self.healthy:
+                raise ConnectionError("rail down")
+            return True
+    
+    now = [0.0]
+    router = AdaptiveRoutingStrategy(max_consecutive_failures=3, cooldown=10, clock=lambda: now[0])
+    card = FakeRail()
+    paypal = FakeRail()
+    router.add_strategy(card, cost=0.0)
+    router.add_strategy(paypal, cost=0.5)
+    processor = PaymentProcessor()
+    processor.set_payment_strategy(router)
+    
+    # The cheaper rail wins while healthy
+    for _ in range(5):
+        assert processor.execute_payment(10.0)
+    assert card.calls == 5 and paypal.calls == 0
+    
+    # A failing rail is routed around and its circuit opens
+    card.healthy = False
+    for _ in range(10):
+        assert processor.execute_payment(10.0)
+    assert router.health(card).state == CircuitState.OPEN
+    assert card.calls == 8 and paypal.calls == 10
+    
+    # After the cooldown a probe closes the circuit again
+    card.healthy = True
+    now[0] = 11
+    assert processor.execute_payment(10.0)
+    assert router.health(card).state == CircuitState.CLOSED
+    assert card.calls == 9
+
 def test_factory():
     car = VehicleFactory.create_vehicle(VehicleType.CAR, "Test Car")
     assert car.__class__.__name__ == "Car"
@@ -48,6 +535,105 @@ def test_factory():
             assert "Engine started" in content
     os.unlink(f.name)
 
+def test_vehicle_registry():
+    truck = VehicleFactory.create_vehicle("truck", "Ford F-150")
+    assert truck.__class__.__name__ == "Truck"
+    
+    @register_vehicle("scooter")
+    class Scooter(Vehicle):
+        def __init__(self, model: str):
+            self.model = model
+        
+        def start_engine(self, output_file=None):
+            pass
+        
+        def stop_engine(self, output_file=None):
+            pass
+    
+    assert isinstance(VehicleFactory.create_vehicle("scooter", "Vespa"), Scooter)
+    
+    # Lazy plugins are imported on first use only
+    sys.modules.pop("tests.vehicle_plugin", None)
+    VehicleFactory.register("bus", "tests.vehicle_plugin:Bus")
+    assert "tests.vehicle_plugin" not in sys.modules
+    bus = VehicleFactory.create_vehicle("bus", "Volvo 9700")
+    assert str(bus) == "Bus: Volvo 9700"
+    assert "bus" in VehicleFactory.registered_types()
+    
+    # A plugin that fails to import keeps reporting the import error
+    VehicleFactory.register("ghost", "tests.no_such_plugin:Ghost")
+    for _ in range(2):
+        try:
+            VehicleFactory.create_vehicle("ghost", "Phantom")
+            assert False, "expected ImportError"
+        except ImportError:
+            pass
+    VehicleFactory.unregister("ghost")
+    
+    VehicleFactory.unregister("scooter")
+    VehicleFactory.unregister("bus")
+    try:
+        VehicleFactory.create_vehicle("scooter", "Vespa")
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "Unknown vehicle type" in str(exc)
+
+def test_fleet_views():
+    fleet = create_many([(VehicleType.CAR, "Toyota Camry"), ("motorcycle", "Harley Davidson"), ("car", "Toyota Camry")])
+    fleet.extend([("truck", "Ford F-150")])
+    assert len(fleet) == 4
+    assert [str(vehicle) for vehicle in fleet] == ["Car: Toyota Camry", "Motorcycle: Harley Davidson",
+                                                   "Car: Toyota Camry", "Truck: Ford F-150"]
+    assert fleet.count_by_type() == {"car": 2, "motorcycle": 1, "truck": 1}
+    
+    out = io.StringIO()
+    fleet[-1].start_engine(out)
+    fleet[0].stop_engine(out)
+    assert out.getvalue() == "Truck Ford F-150: Diesel engine rumbles powerfully\nCar Toyota Camry: Engine stopped\n"
+    assert isinstance(fleet[1], Vehicle) and not hasattr(fleet[1], "__dict__")
+    assert fleet.materialize(1).__class__.__name__ == "Motorcycle"
+    
+    from_csv = Fleet.from_csv(io.StringIO("type,model\ncar,Honda Civic\ntruck,Volvo FH\n"), header=True)
+    assert [str(vehicle) for vehicle in from_csv] == ["Car: Honda Civic", "Truck: Volvo FH"]
+
+def test_vehicle_pool():
+    pool = VehiclePool(max_size=1)
+    with pool.vehicle(VehicleType.CAR, "Toyota Camry") as car:
+        assert str(car) == "Car: Toyota Camry"
+    with pool.vehicle("car", "Honda Civic") as reused:
+        assert reused is car
+        assert str(reused) == "Car: Honda Civic"
+    
+    first = pool.acquire(VehicleType.TRUCK, "Ford F-150")
+    second = pool.acquire(VehicleType.TRUCK, "Volvo FH")
+    pool.release(first)
+    pool.release(second)
+    pool.release(first)
+    assert pool.size(VehicleType.TRUCK) == 1
+    assert pool.stats()["discarded"] == 2
+    assert pool.hit_rate == 0.25
+    
+    # Vehicles the pool never handed out are rejected
+    stranger = VehicleFactory.create_vehicle(VehicleType.TRUCK, "Scania R")
+    pool.release(stranger)
+    assert pool.size(VehicleType.TRUCK) == 1
+    assert pool.stats()["discarded"] == 3 and pool.stats()["releases"] == 4
+    
+    shared = ThreadSafeVehiclePool(max_size=8)
+    
+    def churn():
+        for _ in range(200):
+            with shared.vehicle(VehicleType.MOTORCYCLE, "Yamaha R1") as bike:
+                bike.start_engine(io.StringIO())
+    
+    threads = [threading.Thread(target=churn) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert shared.hits + shared.misses == 800
+    assert shared.misses <= 4 and shared.size() <= 4
+
 def test_singleton():
     config1 = ConfigurationManager()
     config2 = ConfigurationManager()
@@ -57,19 +643,520 @@ def test_singleton():
     config1.set("test_key", "test_value")
     assert config2.get("test_key") == "test_value"
 
+def test_config_snapshots():
+    config = ConfigurationManager()
+    before = config.get_all_config()
+    version = config.version
+    
+    with config.transaction():
+        config.set("timeout", 45)
+        config.set("max_connections", 250)
+        # Readers still see the old snapshot until the transaction commits
+        assert config.version == version
+    assert config.version == version + 1
+    assert config.get("timeout") == 45 and config.get("max_connections") == 250
+    
+    # Earlier snapshots are immutable and unaffected by later writes
+    assert before.get("max_connections") != 250
+    try:
+        config.get_all_config()["timeout"] = 1
+        assert False, "snapshots must be read-only"
+    except TypeError:
+        pass
+    
+    def writer(i):
+        config.set(f"worker_{i}", i)
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(config.get(f"worker_{i}") == i for i in range(8))
+    assert config.version == version + 9
+
+def test_config_files_hot_reload():
+    config = ConfigurationManager()
+    changes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.json")
+        local = os.path.join(tmp, "local.ini")
+        with open(base, "w") as f:
+            f.write('{"database_url": "db:5432/prod", "cache": {"ttl": 60}}')
+        with open(local, "w") as f:
+            f.write("[cache]\nttl = 120\n")
+        os.environ["DPTEST_POOL_SIZE"] = "500"
+        try:
+            config.load_files(base, local, env_prefix="DPTEST_")
+            assert config.get("database_url") == "db:5432/prod"
+            assert config.get("cache.ttl") == 120
+            assert config.get("pool_size") == 500
+            version = config.version
+            config.subscribe(changes.append, keys=["cache.ttl"])
+            
+            # Unchanged files do not produce a new version
+            assert config.reload() == {}
+            assert config.version == version
+            
+            with open(local, "w") as f:
+                f.write("[cache]\nttl = 300\n")
+            os.utime(local, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+            assert config.reload() == {"cache.ttl": (120, 300)}
+            assert changes == [{"cache.ttl": (120, 300)}]
+            
+            # Changes to keys nobody subscribed to are not delivered
+            with open(base, "w") as f:
+                f.write('{"database_url": "db:5432/staging", "cache": {"ttl": 60}}')
+            os.utime(base, ns=(time.time_ns() + 2 * 10**9, time.time_ns() + 2 * 10**9))
+            config.reload()
+            assert config.get("database_url") == "db:5432/staging"
+            assert len(changes) == 1
+            
+            # A parse error keeps the last good values and is retried next poll
+            with open(base, "w") as f:
+                f.write('{"database_url": ')
+            os.utime(base, ns=(time.time_ns() + 3 * 10**9, time.time_ns() + 3 * 10**9))
+            for _ in range(2):
+                try:
+                    config.reload()
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError("broken configuration file was accepted")
+            assert config.get("database_url") == "db:5432/staging"
+            
+            # Concurrent first reads after load_files() all see the file values,
+            # even while one of them is still parsing a large file
+            with open(base, "w") as f:
+                json.dump({"retries": 99, **{f"padding.key{i}": i for i in range(20000)}}, f)
+            config.load_files(base)
+            barrier = threading.Barrier(8)
+            seen = []
+            
+            def first_read():
+                barrier.wait()
+                seen.append(config.get("retries"))
+            
+            readers = [threading.Thread(target=first_read) for _ in range(8)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+            assert seen == [99] * 8
+        finally:
+            del os.environ["DPTEST_POOL_SIZE"]
+            config.unsubscribe(changes.append)
+            config.load_files()
+    assert config.get("database_url") == "localhost:5432/mydb"
+
+def _read_shared_config(name, key, results):
+    store = SharedConfigStore(name)
+    results.put(store.get(key))
+    store.close()
+
+def test_shared_memory_config():
+    config = ConfigurationManager()
+    store = SharedConfigStore(size=64 * 1024)
+    try:
+        before = config.version
+        config.use_shared_memory(store, publish=True)
+        assert config.version > before
+        config.set("feature_flags", {"new_checkout": True})
+        
+        # Another handle on the same segment sees the update on its next read
+        reader = SharedConfigStore(store.name)
+        assert reader.get("feature_flags") == {"new_checkout": True}
+        assert reader.get("database_url") == config.get("database_url")
+        versions = (reader.version, config.version)
+        
+        with config.transaction():
+            config.set("timeout", 90)
+            config.set("debug_mode", True)
+        assert reader.get("timeout") == 90 and reader.get("debug_mode") is True
+        assert (reader.version, config.version) == (versions[0] + 1, versions[1] + 1)
+        
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=_read_shared_config, args=(store.name, "timeout", results))
+        child.start()
+        assert results.get(timeout=10) == 90
+        child.join()
+        reader.close()
+    finally:
+        attached = config.version
+        config.detach_shared_memory()
+        store.close()
+    assert config.get("timeout") == 90
+    assert config.version > attached
+    
+    # Attaching without publish is read-only and still never moves the version back
+    other = SharedConfigStore(size=64 * 1024)
+    try:
+        other.publish({**config.snapshot(), "timeout": 5, "pair": (1, 2)})
+        before = config.version
+        config.use_shared_memory(other)
+        assert config.get("timeout") == 5 and config.version > before
+        try:
+            config.set("timeout", 10)
+            assert False, "read-only attachments must not write to the store"
+        except RuntimeError:
+            pass
+        assert other.get("timeout") == 5
+        attached = config.version
+    finally:
+        config.detach_shared_memory()
+        other.close()
+    # Values are JSON round-tripped through the store
+    assert config.version > attached and config.get("pair") == [1, 2]
+    config.set("timeout", 90)
+
+def test_media_format_registry():
+    player = UniversalMediaPlayer()
+    out = io.StringIO()
+    player.play("MP3", "song.mp3", out)
+    player.play("video/mp4", "movie.mp4", out)
+    player.play(".wav", "sound.wav", out)
+    player.play("avi", "video.avi", out)
+    lines = out.getvalue().splitlines()
+    assert lines[1] == "Playing MP3 file: song.mp3"
+    assert lines[3] == "Playing MP4 file: movie.mp4"
+    assert lines[5] == "Playing WAV file: sound.wav"
+    assert lines[7] == "Format avi not supported by any player"
+    
+    # New formats only need a registration, not edits to the adapters
+    played = []
+    player.formats.register("flac", lambda filename, output_file=None: played.append(filename),
+                            mime_types=["audio/flac"], extensions=[".flac"])
+    player.play("audio/FLAC", "track.flac", out)
+    assert played == ["track.flac"]
+    player.formats.unregister("flac")
+    assert "audio/flac" not in player.formats.formats()
+    player.play("flac", "track.flac", out)
+    assert out.getvalue().endswith("Format flac not supported by any player\n")
+    
+    # The individual adapters still report formats they don't handle
+    out = io.StringIO()
+    AdvancedMediaAdapter().play("mp3", "song.mp3", out)
+    LegacyAudioAdapter().play("VLC", "clip.vlc", out)
+    LegacyAudioAdapter().play("WAV", "sound.wav", out)
+    assert out.getvalue().splitlines() == [
+        "Unsupported format: mp3",
+        "Unsupported format: VLC",
+        "Playing WAV file: sound.wav",
+    ]
+
+class _RecordingPlayer(UniversalMediaPlayer):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+    
+    def play_chunk(self, audio_type, chunk):
+        assert isinstance(chunk, memoryview)
+        self.chunks.append((audio_type, bytes(chunk[:4]), len(chunk)))
+        return len(chunk)
+
+def test_streaming_media_player():
+    assert sniff_format(b"RIFF\x00\x00\x00\x00WAVEfmt ") == "wav"
+    assert sniff_format(b"\x00\x00\x00\x18ftypisom") == "mp4"
+    assert sniff_format(b"ID3\x04") == "mp3"
+    assert sniff_format(b"plain text") is None
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # A WAV file with a misleading extension is detected from its header
+        path = os.path.join(tmp, "mislabelled.mp3")
+        payload = b"RIFF\x00\x00\x00\x00WAVE" + bytes(10_000)
+        with open(path, "wb") as f:
+            f.write(payload)
+        unknown = os.path.join(tmp, "notes.avi")
+        with open(unknown, "wb") as f:
+            f.write(b"RIFF\x00\x00\x00\x00AVI " + bytes(100))
+        
+        for use_mmap in (False, True):
+            player = _RecordingPlayer()
+            streamer = StreamingMediaPlayer(player, chunk_size=4096, use_mmap=use_mmap)
+            out = io.StringIO()
+            assert streamer.stream(path, "mp3", out) == len(payload)
+            assert out.getvalue() == "Attempting to play mislabelled.mp3 as wav\nPlaying WAV file: mislabelled.mp3\n"
+            assert [size for _, _, size in player.chunks] == [4096, 4096, len(payload) - 8192]
+            assert player.chunks[0][:2] == ("wav", b"RIFF")
+            
+            assert streamer.stream(unknown, output_file=out) == 0
+            assert out.getvalue().endswith("Format avi not supported by any player\n")
+            assert streamer.throughput["wav"].bytes == len(payload)
+            assert "avi" not in streamer.throughput
+        
+        report = io.StringIO()
+        streamer.report(report)
+        assert report.getvalue().startswith("wav: 1 files, 0.0 MB at ")
+        
+        # Without overrides the bytes reach the adapter registered for the format
+        player = UniversalMediaPlayer()
+        assert StreamingMediaPlayer(player, chunk_size=4096).stream(path, output_file=out) == len(payload)
+        assert player.legacy_adapter.legacy_player.bytes_decoded == {"wav": len(payload)}
+        assert player.play_chunk("avi", memoryview(payload)) == 0
+
+def test_playlist_prefetch():
+    in_flight = []
+    peak = [0]
+    lock = threading.Lock()
+    
+    def slow_loader(filename):
+        with lock:
+            in_flight.append(filename)
+            peak[0] = max(peak[0], len(in_flight))
+        # Later items finish first, so ordering has to come from the engine
+        time.sleep(0.02 if filename.endswith("0.mp3") else 0.001)
+        with lock:
+            in_flight.remove(filename)
+        if filename == "broken.wav":
+            raise OSError("disk error")
+        return filename
+    
+    playlist = [("mp3", f"track{i}.mp3") for i in range(20)]
+    playlist.insert(5, ("wav", "broken.wav"))
+    engine = PlaylistEngine(prefetch=4, loader=slow_loader)
+    out = io.StringIO()
+    stats = engine.play(iter(playlist), out)
+    
+    lines = out.getvalue().splitlines()
+    assert lines[10] == "Could not load broken.wav: disk error"
+    played = [line.split()[3] for line in lines if line.startswith("Attempting")]
+    assert played == [filename for _, filename in playlist if filename != "broken.wav"]
+    assert stats.played == 20 and stats.failed == 1
+    assert peak[0] <= 4 and stats.max_buffered <= 4
+    
+    # With a streaming player the prefetched handle is what gets played
+    class CountingStreamer(StreamingMediaPlayer):
+        opened = 0
+        
+        def _open(self, path):
+            CountingStreamer.opened += 1
+            return super()._open(path)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        playlist = []
+        for i in range(6):
+            path = os.path.join(tmp, f"take{i}.mp3")
+            with open(path, "wb") as f:
+                f.write(b"ID3\x04" + bytes(5_000 * (i + 1)))
+            playlist.append(("mp3", path))
+        playlist.append(("mp3", os.path.join(tmp, "missing.mp3")))
+        
+        player = UniversalMediaPlayer()
+        streamer = CountingStreamer(player, chunk_size=4096)
+        out = io.StringIO()
+        stats = PlaylistEngine(streamer, prefetch=3).play(playlist, out)
+        assert CountingStreamer.opened == 7
+        assert stats.played == 6 and stats.failed == 1
+        assert player.legacy_adapter.legacy_player.bytes_decoded["mp3"] == sum(4 + 5_000 * (i + 1) for i in range(6))
+        lines = out.getvalue().splitlines()
+        assert [line.split()[3] for line in lines if line.startswith("Attempting")] == [f"take{i}.mp3" for i in range(6)]
+        assert lines[-1].startswith("Could not load")
+        
+        prefetched = streamer.prefetch(playlist[0][1])
+        assert isinstance(prefetched, PrefetchedMedia) and prefetched.head.startswith(b"ID3")
+        prefetched.close()
+        
+        # The default engine streams and prefetches real files on its own
+        engine = PlaylistEngine(prefetch=3)
+        assert isinstance(engine.player, StreamingMediaPlayer)
+        out = io.StringIO()
+        stats = engine.play(playlist[:6], out)
+        assert stats.played == 6 and stats.max_buffered == 3
+        assert engine.player.player.legacy_adapter.legacy_player.bytes_decoded["mp3"] == sum(4 + 5_000 * (i + 1) for i in range(6))
+    
+    # A player that cannot prefetch needs a loader
+    try:
+        PlaylistEngine(UniversalMediaPlayer())
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "loader" in str(exc)
+
+def test_output_sinks():
+    memory = MemorySink()
+    app = MobileApp("Ticker", sink=memory)
+    bot = TradingBot(sink=memory)
+    stock = Stock("AAPL", 120.0)
+    stock.add_observer(app)
+    stock.add_observer(bot)
+    stock.set_price(160.0)
+    CreditCardPayment("1234567890123456", "12/25", "123", sink=memory).process_payment(10)
+    assert memory.lines == [
+        "[Ticker] Stock AAPL price updated: $160.00",
+        "[TradingBot] Selling AAPL at high price $160.00",
+        "Processing credit card payment of $10.00",
+        "Card: ****-****-****-3456",
+    ]
+    
+    # A per-call output_file still wins over the configured sink
+    out = io.StringIO()
+    app.update("MSFT", 300.0, out)
+    assert out.getvalue() == "[Ticker] Stock MSFT price updated: $300.00\n"
+    emit(out, "plain file")
+    emit(NullSink(), "dropped")
+    assert out.getvalue().endswith("plain file\n")
+    
+    # Vehicles and media players also take their sink once
+    memory = MemorySink()
+    car = VehicleFactory.create_vehicle(VehicleType.CAR, "Civic", sink=memory)
+    car.start_engine()
+    UniversalMediaPlayer(sink=memory).play("mp3", "song.mp3")
+    LegacyAudioAdapter(sink=memory).play("avi", "clip.avi")
+    assert memory.lines == [
+        "Car Civic: Engine started quietly",
+        "Attempting to play song.mp3 as mp3",
+        "Playing MP3 file: song.mp3",
+        "Unsupported format: avi",
+    ]
+    
+    # Wrapping sinks accept plain files as their target
+    plain = io.StringIO()
+    with BatchingSink(plain) as batching:
+        batching.emit("queued")
+    assert plain.getvalue() == "queued\n"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        sink = BatchingSink(JsonLinesSink(FileSink(path), clock=lambda: 1.0), max_batch=100)
+        for i in range(1_000):
+            sink.emit(f"tick {i}", seq=i)
+        sink.write("raw line\n")
+        sink.close()
+        assert sink.batches >= 10
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+    assert len(records) == 1_001
+    assert records[0] == {"ts": 1.0, "message": "tick 0", "seq": 0}
+    assert [record.get("seq") for record in records[:-1]] == list(range(1_000))
+    assert records[-1]["message"] == "raw line"
+
 def test_decorator():
     coffee = SimpleCoffee()
     coffee_with_milk = MilkDecorator(coffee)
     assert coffee_with_milk.get_cost() > coffee.get_cost()
     assert "milk" in coffee_with_milk.get_description()
 
+def test_deep_decorator_chain():
+    coffee = SimpleCoffee()
+    expected_cost = coffee.get_cost()
+    for i in range(20_000):
+        decorator = (MilkDecorator, SugarDecorator, CaramelDecorator)[i % 3]
+        coffee = decorator(coffee)
+        expected_cost += decorator._cost_delta
+    assert coffee.get_cost() == expected_cost
+    description = coffee.get_description()
+    assert description.startswith("Simple coffee, milk, sugar, caramel, milk")
+    assert description.count(", ") == 20_000
+    assert coffee.get_description() is description
+    
+    # Decorators that override the methods themselves still compose
+    class ExtraShot(CoffeeDecorator):
+        def get_cost(self):
+            return self._coffee.get_cost() + 1.0
+        
+        def get_description(self):
+            return self._coffee.get_description() + ", extra shot"
+    
+    drink = SugarDecorator(ExtraShot(MilkDecorator(SimpleCoffee())))
+    assert drink.get_description() == "Simple coffee, milk, extra shot, sugar"
+    assert drink.get_cost() == 2.50 + 0.50 + 1.0 + 0.25
+
+def test_bulk_pricing():
+    orders = [
+        SimpleCoffee(),
+        SugarDecorator(MilkDecorator(SimpleCoffee())),
+        CaramelDecorator(CaramelDecorator(MilkDecorator(SimpleCoffee()))),
+        MilkDecorator(SugarDecorator(SugarDecorator(SugarDecorator(SimpleCoffee())))),
+    ]
+    matrix = ToppingMatrix.from_orders(orders * 3)
+    assert len(matrix) == 12 and matrix.row(2) == (1, 0, 0, 2, 0)
+    
+    pricer = BulkPricer()
+    totals = pricer.totals(matrix)
+    assert [f"{total:.2f}" for total in totals] == [f"{order.get_cost():.2f}" for order in orders * 3]
+    assert pricer.totals_cents(ToppingMatrix.from_rows([(0, 0, 0, 0, 0), (2, 1, 1, 1, 1)])).tolist() == [250, 630]
+    
+    descriptions = pricer.descriptions(matrix)
+    assert descriptions[1] == orders[1].get_description()
+    assert descriptions[3] == "Simple coffee, milk, sugar, sugar, sugar"
+    try:
+        ToppingMatrix.from_orders([SugarDecorator(CoffeeDecorator(SimpleCoffee()))])
+        assert False, "undeclared decorator types cannot be bulk priced"
+    except ValueError:
+        pass
+
+def test_interned_drinks():
+    interner = DrinkInterner(max_strong=2)
+    first = interner.build([MilkDecorator, SugarDecorator])
+    second = interner.wrap(SugarDecorator, interner.wrap(MilkDecorator, interner.base))
+    assert first is second
+    assert first.get_description() == "Simple coffee, milk, sugar"
+    assert interner.stats()["hits"] == 2 and interner.stats()["misses"] == 2
+    
+    # Commutative normalization folds add-on order onto one canonical drink
+    assert interner.build([SugarDecorator, MilkDecorator]) is not first
+    assert interner.build([SugarDecorator, MilkDecorator], normalize=True) is first
+    
+    # Drinks outside the strong LRU are only held weakly
+    for topping in (CaramelDecorator, MilkDecorator, SugarDecorator):
+        interner.build([topping, topping])
+    del first, second
+    gc.collect()
+    assert interner.stats()["pinned"] == 2
+    assert len(interner) < 8
+    assert interner.build([MilkDecorator, SugarDecorator]).get_cost() == 3.25
+
+def test_demo_runner():
+    assert main.select_demos() == list(main.DEMOS)
+    assert main.select_demos(["structural"]) == ["adapter", "decorator"]
+    assert main.select_demos(["obs*", "si*"]) == ["observer", "singleton"]
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = main.run_demos(["adapter", "decorator"], tmp, jobs=2, threads=True)
+        assert set(timings) == {"adapter", "decorator"}
+        assert sorted(os.listdir(tmp)) == ["adapter_media.txt", "decorator_coffee.txt"]
+    
+    assert main.parse_args(["-j", "0"]).jobs == 0
+    stderr = sys.stderr
+    sys.stderr = io.StringIO()
+    try:
+        main.parse_args(["--jobs", "-1"])
+        assert False, "expected a usage error"
+    except SystemExit as exc:
+        assert exc.code == 2 and "--jobs" in sys.stderr.getvalue()
+    finally:
+        sys.stderr = stderr
+
 def run_all_tests():
     print("Running tests...")
     test_observer()
+    test_market_batch_ticks()
+    test_async_dispatch_slow_consumer()
+    test_subscription_registry()
+    test_price_trigger_engine()
+    test_conflating_observer()
+    test_tick_journal_replay()
+    test_process_observer_pool()
     test_strategy()
+    test_execute_batch()
+    test_async_payments_share_pool()
+    test_idempotent_payments()
+    test_adaptive_routing()
     test_factory()
+    test_vehicle_registry()
+    test_fleet_views()
+    test_vehicle_pool()
     test_singleton()
+    test_config_snapshots()
+    test_config_files_hot_reload()
+    test_shared_memory_config()
+    test_media_format_registry()
+    test_streaming_media_player()
+    test_playlist_prefetch()
+    test_output_sinks()
     test_decorator()
+    test_deep_decorator_chain()
+    test_bulk_pricing()
+    test_interned_drinks()
+    test_demo_runner()
     print("All tests passed! ✅")
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from common.output_sink import emit
+from creational.factory_vehicles import Vehicle
+
+# Stand-in for a plugin module that is only imported on first use
+
+class Bus(Vehicle):
+    def __init__(self, model: str, sink=None):
+        self.model = model
+        self.sink = sink
+    
+    def start_engine(self, output_file=None):
+        message = f"Bus {self.model}: Engine started"
+        emit(output_file or self.sink, message)
+    
+    def stop_engine(self, output_file=None):
+        message = f"Bus {self.model}: Engine stopped"
+        emit(output_file or self.sink, message)
+    
+    def __str__(self):
+        return f"Bus: {self.model}"